@@ -27,11 +27,14 @@ api = NinjaAPI(
 @api.exception_handler(CustomBaseException)
 def exception_handle_func(request: HttpRequest, exc: CustomBaseException):
     resp = exc.to_pydantic()
-    return api.create_response(
+    response = api.create_response(
         request,
         resp,
         status=resp.code,
     )
+    for header_key, header_value in exc.headers.items():
+        response[header_key] = header_value
+    return response
 
 
 api.add_router(prefix=API_PREFIX, router=api_v1_router)
@@ -1,12 +1,17 @@
+import json
+
 from api.api_core.routes import EnumDetailRoutes
 from api.api_core.schemas.accounts_schemas import (
     AccountSchema,
     AuthSchema,
+    JWKSetSchema,
     RegisterUserIn,
 )
 from api.api_core.schemas.error_schemas import BadResponse
 from api.api_core.schemas.response_schema import SuccessResponse
+from api.api_core.utils.conditional import get_not_modified_response, make_etag
 from api.api_core.utils.exceptions import EmailAlreadyExistsError
+from api.api_core.utils.rate_limit import rate_limit
 from api.api_core.utils.response import RespModel, get_response
 from apps.accounts.models import User
 from django.db import IntegrityError
@@ -14,6 +19,13 @@ from django.http import HttpRequest, HttpResponse
 from ninja import Router
 from services.auth_services.auth_checker import HeaderAccessKey, HeaderRefreshKey
 from services.db_handlers.accounts_handler import AccountsHandler
+from settings import (
+    JWKS_MAX_AGE,
+    LOGIN_RATE_LIMIT_PER_EMAIL,
+    LOGIN_RATE_LIMIT_PER_IP,
+    REGISTER_RATE_LIMIT_PER_EMAIL,
+    REGISTER_RATE_LIMIT_PER_IP,
+)
 
 accounts_router = Router()
 
@@ -23,13 +35,19 @@ accounts_router = Router()
     summary="Register a new user",
     response={
         200: SuccessResponse,
-        (400, 404): BadResponse,
+        (400, 404, 429, 503): BadResponse,
     },
     auth=None,
 )
-def register_user(request, payload: RegisterUserIn):
+@rate_limit(
+    "register",
+    per_ip=REGISTER_RATE_LIMIT_PER_IP,
+    per_email=REGISTER_RATE_LIMIT_PER_EMAIL,
+    email_param="payload",
+)
+async def register_user(request, payload: RegisterUserIn):
     try:
-        User.objects.create_user(
+        await User.objects.acreate_user(
             first_name=payload.first_name,
             last_name=payload.last_name,
             email=payload.email,
@@ -48,13 +66,80 @@ Returns a pair of tokens in the header:
 `{HeaderRefreshKey.param_name}`, `{HeaderAccessKey.param_name}`
 """,
     auth=None,
-    response={200: RespModel[AccountSchema], 400: BadResponse},
+    response={200: RespModel[AccountSchema], (400, 429, 503): BadResponse},
+)
+@rate_limit(
+    "login",
+    per_ip=LOGIN_RATE_LIMIT_PER_IP,
+    per_email=LOGIN_RATE_LIMIT_PER_EMAIL,
+    email_param="auth_data",
 )
-def login_route(request: HttpRequest, response: HttpResponse, auth_data: AuthSchema):
-    headers, user = AccountsHandler.user_login(data=auth_data, request=request)
+async def login_route(
+    request: HttpRequest, response: HttpResponse, auth_data: AuthSchema
+):
+    headers, user = await AccountsHandler.user_login(data=auth_data, request=request)
     user = user.to_pydantic()
     return get_response(
         user,
         response=response,
         headers=headers,
     )
+
+
+@accounts_router.post(
+    EnumDetailRoutes.AUTH_REFRESH,
+    summary="Refresh tokens",
+    description=f"""Replaces the session of the refresh token with a new one.
+Returns a pair of tokens in the header:
+`{HeaderRefreshKey.param_name}`, `{HeaderAccessKey.param_name}`
+""",
+    auth=HeaderRefreshKey(),
+    response={200: SuccessResponse, 403: BadResponse},
+)
+def refresh_route(request: HttpRequest, response: HttpResponse):
+    headers = AccountsHandler.refresh_jwt_headers(request.auth)
+    for header_key, header_value in headers.items():
+        response[header_key] = header_value
+    return SuccessResponse()
+
+
+@accounts_router.post(
+    EnumDetailRoutes.AUTH_LOGOUT,
+    summary="Logout",
+    description="Ends the session of the access token.",
+    response={200: SuccessResponse, 403: BadResponse},
+)
+def logout_route(request: HttpRequest):
+    AccountsHandler.user_logout(request.auth)
+    return SuccessResponse()
+
+
+@accounts_router.post(
+    EnumDetailRoutes.AUTH_LOGOUT_EVERYWHERE,
+    summary="Logout everywhere",
+    description="Ends every session of the user, the current one included.",
+    response={200: SuccessResponse, 403: BadResponse},
+)
+def logout_everywhere_route(request: HttpRequest):
+    AccountsHandler.user_logout_everywhere(request.auth)
+    return SuccessResponse()
+
+
+@accounts_router.get(
+    EnumDetailRoutes.JWKS,
+    summary="JWKS",
+    description="""Public keys verifying tokens signed with RS256/EdDSA,
+looked up by the `kid` header of a token. Empty for a shared secret.""",
+    auth=None,
+    response={200: JWKSetSchema, 304: None},
+    exclude_none=True,
+)
+def jwks_route(request: HttpRequest, response: HttpResponse):
+    jwks = AccountsHandler.get_jwks()
+    response["Cache-Control"] = f"public, max-age={JWKS_MAX_AGE}"
+    not_modified = get_not_modified_response(
+        request, response, etag=make_etag(json.dumps(jwks, sort_keys=True))
+    )
+    if not_modified:
+        return not_modified
+    return jwks
@@ -1,16 +1,23 @@
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import List
 
 from api.api_core.routes import EnumDetailRoutes
 from api.api_core.schemas.error_schemas import BadResponse
-from api.api_core.schemas.event_schemas import EventFiltersSchema, EventSchema
-from api.api_core.schemas.response_schema import SuccessResponse
-from api.api_core.utils.exceptions import (
-    CannotDeleteOtherEvent,
-    CannotUpdateOtherEvent,
-    EventDoesNotExistError,
+from api.api_core.schemas.event_schemas import (
+    BulkRegistrationResultSchema,
+    BulkRegistrationSchema,
+    CheckInBatchSchema,
+    CheckInScanResultSchema,
+    EventFiltersSchema,
+    EventRegistrationSchema,
+    EventSchema,
+    EventsPageSchema,
+    UserRegistrationsFiltersSchema,
+    UserRegistrationsPageSchema,
 )
-from apps.events.models import Event
+from api.api_core.schemas.response_schema import SuccessResponse
+from api.api_core.utils.conditional import get_not_modified_response, make_etag
+from django.http import HttpRequest, HttpResponse
 from ninja import Query, Router
 from services.db_handlers.accounts_handler import AccountsHandler
 from services.db_handlers.events_handler import EventsHandler
@@ -23,12 +30,21 @@ events_router = Router()
     summary="Get event information",
     response={
         200: EventSchema,
+        304: None,
         (400, 404): BadResponse,
     },
 )
-def get_event_info(request, event_id: int):
-    event = EventsHandler.get_event_obj(event_id)
-    return event.to_pydantic()
+def get_event_info(request: HttpRequest, response: HttpResponse, event_id: int):
+    event = EventsHandler.get_event_info(event_id)
+    not_modified = get_not_modified_response(
+        request,
+        response,
+        etag=make_etag(event["id"], event["updated_at"]),
+        last_modified=datetime.fromisoformat(event["updated_at"]),
+    )
+    if not_modified:
+        return not_modified
+    return event
 
 
 @events_router.post(
@@ -56,24 +72,7 @@ def create_event(request, payload: EventSchema):
 )
 def update_event(request, event_id: int, payload: EventSchema):
     user = AccountsHandler.get_user_by_id(request)
-    try:
-        event = Event.objects.get(id=event_id)
-    except Event.DoesNotExist:
-        raise EventDoesNotExistError()
-
-    if event.organizer != user:
-        raise CannotUpdateOtherEvent()
-
-    event.title = payload.title
-    event.description = payload.description
-    event.date = datetime.fromisoformat(payload.date)
-    event.location = payload.location
-    event.status = payload.status.value
-    event.duration = timedelta(minutes=payload.duration) if payload.duration else None
-    event.max_capacity = payload.max_capacity
-    event.is_draft = payload.is_draft
-
-    event.save()
+    event = EventsHandler.update_event(event_id, user, payload)
 
     return event.to_pydantic()
 
@@ -88,27 +87,34 @@ def update_event(request, event_id: int, payload: EventSchema):
 )
 def delete_event(request, event_id: int):
     user = AccountsHandler.get_user_by_id(request)
-    event = EventsHandler.get_event_obj(event_id)
-    if event.organizer != user:
-        raise CannotDeleteOtherEvent()
-
-    event.delete()
+    EventsHandler.delete_event(event_id, user)
     return SuccessResponse()
 
 
 @events_router.get(
     EnumDetailRoutes.GET_EVENTS_LIST,
     summary="Get list of events",
-    response={200: List[EventSchema], (400, 404, 422): BadResponse},
+    response={200: EventsPageSchema, 304: None, (400, 404, 422): BadResponse},
 )
-def get_events_list_route(request, filters: EventFiltersSchema = Query(...)):
-    return EventsHandler.get_events_list(request=request, filters_query=filters)
+def get_events_list_route(
+    request: HttpRequest,
+    response: HttpResponse,
+    filters: EventFiltersSchema = Query(...),
+):
+    page = EventsHandler.get_events_list(request=request, filters_query=filters)
+    not_modified = get_not_modified_response(
+        request, response, etag=EventsHandler.get_events_list_etag(filters, page)
+    )
+    if not_modified:
+        return not_modified
+    return EventsHandler.events_page_to_schema(page)
 
 
 @events_router.get(
     EnumDetailRoutes.USER_REGISTRATION,
     summary="Register user for an event",
-    response={200: EventSchema, (400, 404, 422): BadResponse},
+    description="Takes a seat or, when the event is full, a place in its waitlist",
+    response={200: EventRegistrationSchema, (400, 404, 422): BadResponse},
 )
 def get_register_user(request, event_id: int):
     user = AccountsHandler.get_user_by_id(request)
@@ -118,8 +124,48 @@ def get_register_user(request, event_id: int):
 @events_router.get(
     EnumDetailRoutes.CANCEL_USER_REGISTRATION,
     summary="Cancel user registration for an event",
-    response={200: EventSchema, (400, 404, 422): BadResponse},
+    response={200: EventRegistrationSchema, (400, 404, 422): BadResponse},
 )
 def get_cancel_user_registration(request, event_id: int):
     user = AccountsHandler.get_user_by_id(request)
     return EventsHandler.cancel_registration(user, event_id)
+
+
+@events_router.post(
+    EnumDetailRoutes.BULK_USER_REGISTRATION,
+    summary="Register a list of users for an event",
+    description="Available to the event organizer. Users beyond free seats are waitlisted",
+    response={
+        200: List[BulkRegistrationResultSchema],
+        (400, 403, 404, 422): BadResponse,
+    },
+)
+def bulk_register_users(request, event_id: int, payload: BulkRegistrationSchema):
+    user = AccountsHandler.get_user_by_id(request)
+    return EventsHandler.bulk_register_users(user, event_id, payload)
+
+
+@events_router.post(
+    EnumDetailRoutes.CHECK_IN,
+    summary="Check in a batch of scanned registrations",
+    description="Resent scans are answered with their stored results",
+    response={
+        200: List[CheckInScanResultSchema],
+        (400, 403, 404, 422): BadResponse,
+    },
+)
+def check_in(request, event_id: int, payload: CheckInBatchSchema):
+    user = AccountsHandler.get_user_by_id(request)
+    return EventsHandler.check_in(user, event_id, payload)
+
+
+@events_router.get(
+    EnumDetailRoutes.USER_REGISTRATIONS,
+    summary="Get registrations of the current user",
+    response={200: UserRegistrationsPageSchema, (400, 404, 422): BadResponse},
+)
+def get_user_registrations(
+    request, filters: UserRegistrationsFiltersSchema = Query(...)
+):
+    user = AccountsHandler.get_user_by_id(request)
+    return EventsHandler.get_user_registrations(user, filters)
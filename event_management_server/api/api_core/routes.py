@@ -12,6 +12,10 @@ class EnumBaseRoutes(str, Enum):
 class EnumDetailRoutes(str, Enum):
     REGISTER_USER = "/register"
     AUTH_LOGIN = "/login"
+    AUTH_REFRESH = "/refresh"
+    AUTH_LOGOUT = "/logout"
+    AUTH_LOGOUT_EVERYWHERE = "/logout_everywhere"
+    JWKS = "/jwks"
 
     # events
     GET_EVENT_INFO_BY_ID = "/get_event_info_by_id"
@@ -22,3 +26,6 @@ class EnumDetailRoutes(str, Enum):
 
     USER_REGISTRATION = "/user_registration"
     CANCEL_USER_REGISTRATION = "/cancel_user_registration"
+    BULK_USER_REGISTRATION = "/bulk_user_registration"
+    CHECK_IN = "/check_in"
+    USER_REGISTRATIONS = "/user_registrations"
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 
 from ninja import Schema
 from pydantic import BaseModel, EmailStr, Field, SecretStr
@@ -48,3 +48,18 @@ class AccountResponseSchema(Schema):
 
     def to_dict(self):
         return self.dict()
+
+
+class JWKSchema(BaseModel):
+    kty: str = Field(..., description="Key type, `RSA` or `OKP`")
+    kid: str = Field(..., description="Key ID, the `kid` header of its tokens")
+    alg: str = Field(..., description="Signing algorithm")
+    use: str = Field("sig", description="Key usage")
+    n: Optional[str] = Field(None, description="RSA modulus")
+    e: Optional[str] = Field(None, description="RSA exponent")
+    crv: Optional[str] = Field(None, description="OKP curve")
+    x: Optional[str] = Field(None, description="OKP public key")
+
+
+class JWKSetSchema(BaseModel):
+    keys: List[JWKSchema] = Field(..., description="Keys verifying tokens")
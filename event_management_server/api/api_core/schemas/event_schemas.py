@@ -1,9 +1,15 @@
+from datetime import datetime
 from enum import Enum
-from typing import Optional
+from typing import List, Optional
 
 from ninja import Schema
 from pydantic import Field
 
+EVENTS_PAGE_DEFAULT_LIMIT = 50
+EVENTS_PAGE_MAX_LIMIT = 200
+BULK_REGISTRATION_MAX_USERS = 1000
+CHECK_IN_MAX_SCANS = 1000
+
 
 class EventStatusEnum(str, Enum):
     SCHEDULED = "scheduled"
@@ -11,6 +17,33 @@ class EventStatusEnum(str, Enum):
     CANCELLED = "cancelled"
 
 
+class BulkRegistrationOutcomeEnum(str, Enum):
+    REGISTERED = "registered"
+    PENDING = "pending"
+    ALREADY_REGISTERED = "already_registered"
+    USER_NOT_FOUND = "user_not_found"
+
+
+class CheckInResultEnum(str, Enum):
+    CHECKED_IN = "checked_in"
+    ALREADY_CHECKED_IN = "already_checked_in"
+    NOT_REGISTERED = "not_registered"
+
+
+class RegistrationPeriodEnum(str, Enum):
+    UPCOMING = "upcoming"
+    PAST = "past"
+
+
+class RegistrationStatusEnum(str, Enum):
+    REGISTERED = "registered"
+    CANCELLED = "cancelled"
+    PENDING = "pending"
+    REJECTED = "rejected"
+    CHECKED_IN = "checked_in"
+    NOT_ATTENDED = "not_attended"
+
+
 class EventSchema(Schema):
     title: str = Field(..., description="Event title")
     description: Optional[str] = Field(None, description="Event description")
@@ -34,3 +67,128 @@ class EventFiltersSchema(Schema):
     date_from: Optional[str] = None
     date_to: Optional[str] = None
     q: Optional[str] = None
+    after: Optional[str] = Field(
+        None,
+        description="Cursor of the page, taken from `next_cursor` of the previous one",
+    )
+    limit: int = Field(
+        EVENTS_PAGE_DEFAULT_LIMIT,
+        ge=1,
+        le=EVENTS_PAGE_MAX_LIMIT,
+        description="Maximum number of events on the page",
+    )
+
+
+class EventListItemSchema(EventSchema):
+    id: int = Field(..., description="Event ID")
+    seats_taken: int = Field(..., description="Number of taken seats")
+    pending_count: int = Field(..., description="Number of waitlisted registrations")
+
+
+class EventsPageSchema(Schema):
+    items: List[EventListItemSchema] = Field(..., description="Events of the page")
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Cursor of the next page, empty on the last page",
+    )
+
+
+class EventRegistrationSchema(Schema):
+    event_id: int = Field(..., description="Event ID")
+    status: RegistrationStatusEnum = Field(..., description="Registration status")
+    registered_at: datetime = Field(..., description="Registration time")
+    waitlist_position: Optional[int] = Field(
+        None,
+        description="Position in the waitlist for pending registrations",
+    )
+
+
+class BulkRegistrationSchema(Schema):
+    user_ids: List[int] = Field(
+        [],
+        max_length=BULK_REGISTRATION_MAX_USERS,
+        description="IDs of users to register",
+    )
+    emails: List[str] = Field(
+        [],
+        max_length=BULK_REGISTRATION_MAX_USERS,
+        description="Emails of users to register",
+    )
+
+
+class BulkRegistrationResultSchema(Schema):
+    user_id: Optional[int] = Field(None, description="Requested user ID")
+    email: Optional[str] = Field(None, description="Requested user email")
+    outcome: BulkRegistrationOutcomeEnum = Field(
+        ..., description="Result of the registration"
+    )
+
+
+class CheckInScanSchema(Schema):
+    scan_id: str = Field(
+        ..., min_length=1, max_length=64, description="Unique ID of the scan"
+    )
+    registration_id: int = Field(..., description="Scanned registration ID")
+    scanned_at: Optional[datetime] = Field(
+        None, description="Scan time on the scanner"
+    )
+
+
+class CheckInBatchSchema(Schema):
+    scans: List[CheckInScanSchema] = Field(
+        ...,
+        max_length=CHECK_IN_MAX_SCANS,
+        description="Scans in the order they were taken",
+    )
+
+
+class CheckInScanResultSchema(Schema):
+    scan_id: str = Field(..., description="ID of the scan")
+    registration_id: int = Field(..., description="Scanned registration ID")
+    result: CheckInResultEnum = Field(..., description="Result of the scan")
+
+
+class UserRegistrationsFiltersSchema(Schema):
+    statuses: Optional[str] = Field(
+        None, description="Comma separated registration statuses"
+    )
+    period: Optional[RegistrationPeriodEnum] = Field(
+        None, description="Upcoming or past events, by event end time"
+    )
+    after: Optional[str] = Field(
+        None,
+        description="Cursor of the page, taken from `next_cursor` of the previous one",
+    )
+    limit: int = Field(
+        EVENTS_PAGE_DEFAULT_LIMIT,
+        ge=1,
+        le=EVENTS_PAGE_MAX_LIMIT,
+        description="Maximum number of registrations on the page",
+    )
+
+
+class EventSummarySchema(Schema):
+    id: int = Field(..., description="Event ID")
+    title: str = Field(..., description="Event title")
+    date: str = Field(..., description="Event datetime")
+    location: str = Field(..., description="Event address")
+    status: EventStatusEnum = Field(..., description="Event status")
+    organizer: str = Field(..., description="Event organizer")
+
+
+class UserRegistrationSchema(Schema):
+    id: int = Field(..., description="Registration ID")
+    status: RegistrationStatusEnum = Field(..., description="Registration status")
+    registered_at: datetime = Field(..., description="Registration time")
+    cancelled_at: Optional[datetime] = Field(None, description="Cancellation time")
+    event: EventSummarySchema = Field(..., description="Registered event")
+
+
+class UserRegistrationsPageSchema(Schema):
+    items: List[UserRegistrationSchema] = Field(
+        ..., description="Registrations of the page, latest first"
+    )
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Cursor of the next page, empty on the last page",
+    )
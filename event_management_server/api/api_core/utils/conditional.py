@@ -0,0 +1,37 @@
+import hashlib
+from datetime import datetime
+from typing import Any, Optional
+
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts: Any) -> str:
+    digest = hashlib.md5(
+        ":".join(map(str, parts)).encode(), usedforsecurity=False
+    ).hexdigest()
+    return quote_etag(digest)
+
+
+def get_not_modified_response(
+    request: HttpRequest,
+    response: HttpResponse,
+    etag: str,
+    last_modified: Optional[datetime] = None,
+) -> Optional[HttpResponse]:
+    """
+    Put validators on the response and evaluate request preconditions.
+    Returns 304/412 response when the body must not be sent, otherwise None
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response["ETag"] = etag
+    if timestamp is not None:
+        response["Last-Modified"] = http_date(timestamp)
+
+    conditional_response = get_conditional_response(
+        request, etag=etag, last_modified=timestamp, response=response
+    )
+    if conditional_response is response:
+        return None
+    return conditional_response
@@ -1,3 +1,6 @@
+import math
+from typing import Dict
+
 from api.api_core.schemas.error_schemas import ErrorModel
 
 
@@ -14,6 +17,10 @@ class CustomBaseException(Exception):
     def detail(self) -> str:
         raise NotImplementedError
 
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {}
+
     def to_pydantic(self) -> ErrorModel:
         return ErrorModel(code=self.code, title=self.title, detail=self.detail)
 
@@ -41,6 +48,16 @@ class Base404Error(CustomBaseException):
         raise NotImplementedError
 
 
+class Base422Error(CustomBaseException):
+    code: int = 422
+    title: str = "UnprocessableEntity"
+
+
+class Base429Error(CustomBaseException):
+    code: int = 429
+    title: str = "TooManyRequests"
+
+
 class EmailAlreadyExistsError(Base400Error):
     @property
     def detail(self) -> str:
@@ -51,6 +68,14 @@ class WrongPasswordError(Base400Error):
     detail: str = "Wrong password"
 
 
+class InvalidCursorError(Base400Error):
+    detail: str = "Provided pagination cursor is invalid."
+
+
+class AlreadyRegisteredError(Base400Error):
+    detail: str = "User is already registered for this event."
+
+
 class CannotDeleteOtherEvent(Base403Error):
     detail = "You do not have permission to delete this event."
 
@@ -59,6 +84,18 @@ class CannotUpdateOtherEvent(Base403Error):
     detail = "You do not have permission to update this event."
 
 
+class CannotRegisterOtherUsers(Base403Error):
+    detail = "Only the event organizer can register other users."
+
+
+class CannotCheckInAttendees(Base403Error):
+    detail = "Only the event organizer can check in attendees."
+
+
+class ConflictingScanError(Base422Error):
+    detail = "The same scan ID is sent with different registration IDs."
+
+
 class UserEmailNotFoundError(Base404Error):
     detail: str = "User with such email does not exist"
 
@@ -73,3 +110,15 @@ class EventDoesNotExistError(Base404Error):
 
 class RegistrationNotFoundError(Base404Error):
     detail: str = "Registration not found for this user and event."
+
+
+class TooManyAttemptsError(Base429Error):
+    detail: str = "Too many attempts, try again later."
+
+    def __init__(self, retry_after: float):
+        super().__init__()
+        self.retry_after = retry_after
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Retry-After": str(math.ceil(self.retry_after))}
@@ -0,0 +1,29 @@
+import base64
+import binascii
+import json
+from typing import Any, Dict
+
+from api.api_core.utils.exceptions import InvalidCursorError
+
+
+def encode_cursor(position: Dict[str, Any]) -> str:
+    """
+    Pack the keyset position of the last returned row into an opaque cursor
+    """
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Unpack a cursor produced by `encode_cursor`
+    :exception InvalidCursorError: if the cursor was not issued by the server
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise InvalidCursorError()
+    if not isinstance(position, dict):
+        raise InvalidCursorError()
+    return position
@@ -0,0 +1,78 @@
+import hashlib
+import inspect
+import ipaddress
+from functools import wraps
+from typing import Any, Callable, Dict, Optional
+
+from asgiref.sync import sync_to_async
+from django.http import HttpRequest
+
+from api.api_core.utils.exceptions import TooManyAttemptsError
+from services.cache.rate_limiter import RateLimit
+from settings import RATE_LIMIT_PROXY_COUNT, RATE_LIMITER
+
+
+def get_client_ip(request: HttpRequest) -> str:
+    """
+    Client address, an IPv6 client is taken by its /64 network
+    """
+    ip = request.META.get("REMOTE_ADDR", "")
+    if RATE_LIMIT_PROXY_COUNT:
+        forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR", "").split(",")
+        if len(forwarded_for) >= RATE_LIMIT_PROXY_COUNT:
+            ip = forwarded_for[-RATE_LIMIT_PROXY_COUNT].strip() or ip
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return ip
+    if address.version == 6:
+        return str(ipaddress.ip_network(f"{address}/64", strict=False).network_address)
+    return str(address)
+
+
+def rate_limit(
+    scope: str,
+    per_ip: Optional[RateLimit] = None,
+    per_email: Optional[RateLimit] = None,
+    email_param: Optional[str] = None,
+) -> Callable:
+    """
+    Rate limit a view by client IP and by the email of its `email_param`
+    schema. Put it under the route decorator, a limited call raises 429
+    before the view runs
+    """
+
+    def get_buckets(request: HttpRequest, kwargs: Dict[str, Any]) -> dict:
+        buckets = {}
+        if per_ip:
+            buckets[f"{scope}_ip_{get_client_ip(request)}"] = per_ip
+        if per_email and email_param:
+            email = kwargs[email_param].email.strip().lower()
+            # emails are not kept in redis
+            digest = hashlib.blake2b(email.encode(), digest_size=12).hexdigest()
+            buckets[f"{scope}_email_{digest}"] = per_email
+        return buckets
+
+    def decorator(view_func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(view_func):
+
+            @wraps(view_func)
+            async def async_wrapper(request: HttpRequest, *args, **kwargs):
+                retry_after = await sync_to_async(
+                    RATE_LIMITER.hit, thread_sensitive=False
+                )(get_buckets(request, kwargs))
+                if retry_after:
+                    raise TooManyAttemptsError(retry_after)
+                return await view_func(request, *args, **kwargs)
+
+            return async_wrapper
+
+        @wraps(view_func)
+        def wrapper(request: HttpRequest, *args, **kwargs):
+            if retry_after := RATE_LIMITER.hit(get_buckets(request, kwargs)):
+                raise TooManyAttemptsError(retry_after)
+            return view_func(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,68 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from services.auth_services.sessions_compactor import (
+    DEFAULT_COMPACTION_BATCH_SIZE,
+    CompactionReport,
+    SessionsCompactor,
+)
+from settings import AUTH_CACHE_HANDLER
+
+
+class Command(BaseCommand):
+    help = (
+        "Prune expired sessions and delete keys of the previous session "
+        "layouts from the auth redis, report the reclaimed memory"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_COMPACTION_BATCH_SIZE,
+            help="Number of keys scanned and compacted per redis call",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.01,
+            help="Seconds slept between batches",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Repeat the walk every N seconds, run once when 0",
+        )
+
+    def handle(self, *args, **options):
+        compactor = SessionsCompactor(
+            AUTH_CACHE_HANDLER, batch_size=options["batch_size"]
+        )
+        while True:
+            self.walk(compactor, options["pause"])
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
+
+    def walk(self, compactor: SessionsCompactor, pause: float):
+        # a walk holds no state in redis, an interrupted one is redone by the next
+        total = CompactionReport()
+        for report in compactor.iter_compact(pause):
+            total.add(report)
+            if report.pruned_sessions or report.deleted_keys:
+                self.stdout.write(
+                    f"Pruned {report.pruned_sessions} sessions, "
+                    f"deleted {report.deleted_keys} keys, "
+                    f"reclaimed {report.reclaimed_bytes} bytes"
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Done, scanned {total.scanned_keys} keys, "
+                f"pruned {total.pruned_sessions} sessions, "
+                f"deleted {total.deleted_keys} keys, "
+                f"reclaimed {total.reclaimed_bytes} bytes"
+            )
+        )
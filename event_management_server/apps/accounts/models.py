@@ -5,6 +5,7 @@ from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, UserManager
 from django.db import models
 from phonenumber_field.modelfields import PhoneNumberField
+from settings import PASSWORD_HASHING_POOL
 
 
 class CustomUserManager(UserManager):
@@ -27,6 +28,18 @@ class CustomUserManager(UserManager):
         extra_fields.setdefault("is_superuser", False)
         return self._create_user(email, password, **extra_fields)
 
+    async def acreate_user(self, email=None, password=None, **extra_fields):
+        """
+        Create a user from async code, the password is hashed in the pool
+        """
+        self._check_extra_required_fields(**extra_fields)
+        extra_fields.setdefault("is_staff", False)
+        extra_fields.setdefault("is_superuser", False)
+        user = self.model(email=self.normalize_email(email), **extra_fields)
+        user.password = await PASSWORD_HASHING_POOL.make_password(password)
+        await user.asave(using=self._db)
+        return user
+
     def create_superuser(self, email=None, password=None, **extra_fields):
         self._check_extra_required_fields(**extra_fields)
 
@@ -1,7 +1,9 @@
 from django.contrib import admin
+from django.contrib.postgres.search import SearchQuery
+from django.db.models import Q
 from django_admin_inline_paginator.admin import TabularInlinePaginated
 
-from apps.events.models import Event, EventRegistration
+from apps.events.models import EVENT_SEARCH_CONFIG, Event, EventRegistration
 
 
 class EventRegistrationInline(TabularInlinePaginated):
@@ -42,16 +44,24 @@ class EventAdmin(admin.ModelAdmin):
         "status",
         "date",
     )
-    search_fields = (
-        "title",
-        "location",
-        "description",
-        "organizer__username",
-        "organizer__email",
-    )
+    # only shows the search box, get_search_results does the search
+    search_fields = ("title",)
     ordering = ("-date",)
     inlines = [EventRegistrationInline]
 
+    def get_search_results(self, request, queryset, search_term):
+        # full-text match over the indexed vector instead of icontains scans
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        search_query = SearchQuery(
+            search_term, search_type="websearch", config=EVENT_SEARCH_CONFIG
+        )
+        queryset = queryset.filter(
+            Q(search_vector=search_query) | Q(organizer__email__iexact=search_term)
+        )
+        return queryset, False
+
 
 class EventRegistrationAdmin(admin.ModelAdmin):
     list_display = (
@@ -70,9 +80,17 @@ class EventRegistrationAdmin(admin.ModelAdmin):
     )
     list_filter = ("status",)
     search_fields = ("event__title", "user__username", "user__email")
-    readonly_fields = ("registered_at", "cancelled_at")
+    # registration changes go through EventsHandler, which keeps the counters
+    # and seats of the event in step, the admin cannot bypass it
+    readonly_fields = ("event", "user", "status", "registered_at", "cancelled_at")
     ordering = ("-registered_at",)
 
+    def has_add_permission(self, request):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
 
 admin.site.register(Event, EventAdmin)
 admin.site.register(EventRegistration, EventRegistrationAdmin)
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from settings import EVENT_DETAIL_CACHE, EVENTS_LIST_CACHE
+
+
+class Command(BaseCommand):
+    help = "Report hits and misses of the event caches summed over all workers"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Reset the counters after reporting them",
+        )
+
+    def handle(self, *args, **options):
+        for cache in (EVENT_DETAIL_CACHE, EVENTS_LIST_CACHE):
+            stats = cache.stats()
+            total = stats["hits"] + stats["misses"]
+            hit_ratio = stats["hits"] / total * 100 if total else 0
+            self.stdout.write(
+                f"{cache.name}: {stats['hits']} hits, {stats['misses']} misses, "
+                f"hit ratio {hit_ratio:.1f}%"
+            )
+            if options["reset"]:
+                cache.reset_stats()
+
+        self.stdout.write(self.style.SUCCESS("Done"))
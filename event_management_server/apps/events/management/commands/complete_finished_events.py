@@ -0,0 +1,62 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from services.db_handlers.events_handler import EventsHandler
+
+
+class Command(BaseCommand):
+    help = (
+        "Complete scheduled events that have ended and mark their unchecked "
+        "registrations as not attended"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Number of finished events fetched per query",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of registrations updated per transaction",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Repeat the sweep every N seconds, run once when 0",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            self.sweep(options["batch_size"], options["chunk_size"])
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
+
+    def sweep(self, batch_size: int, chunk_size: int):
+        # progress is kept in the rows, an interrupted sweep is continued by the next
+        now = timezone.now()
+        after = (None, None)
+        processed = marked = 0
+        while True:
+            keys = EventsHandler.get_finished_event_ids(now, after, batch_size)
+            if not keys:
+                break
+            for _, event_id in keys:
+                marked += EventsHandler.finish_event(event_id, now, chunk_size)
+                processed += 1
+            after = keys[-1]
+            self.stdout.write(f"Processed events up to ID {after[1]}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Done, processed {processed} finished events, "
+                f"{marked} registrations marked as not attended"
+            )
+        )
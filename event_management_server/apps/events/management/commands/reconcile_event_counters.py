@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from services.db_handlers.events_handler import EventsHandler
+
+
+class Command(BaseCommand):
+    help = "Recount registration counters of events and repair drifted ones"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of events locked and recounted per transaction",
+        )
+        parser.add_argument(
+            "--after-id",
+            type=int,
+            default=0,
+            help="Start after this event ID, used to resume an interrupted run",
+        )
+
+    def handle(self, *args, **options):
+        after_id = options["after_id"]
+        total_repaired = 0
+        while True:
+            last_id, repaired = EventsHandler.reconcile_counters(
+                after_id, options["batch_size"]
+            )
+            if last_id is None:
+                break
+            total_repaired += repaired
+            after_id = last_id
+            self.stdout.write(f"Checked events up to ID {last_id}, repaired {repaired}")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Done, repaired {total_repaired} events")
+        )
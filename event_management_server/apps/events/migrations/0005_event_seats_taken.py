@@ -0,0 +1,34 @@
+# Generated by Django 6.0 on 2026-10-18 04:14
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_seats_taken(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    EventRegistration = apps.get_model('events', 'EventRegistration')
+    registered = (
+        EventRegistration.objects.filter(event=OuterRef('pk'), status='registered')
+        .order_by()
+        .values('event')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    Event.objects.update(seats_taken=Coalesce(Subquery(registered), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0004_event_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='seats_taken',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of registrations holding a seat'),
+        ),
+        migrations.RunPython(backfill_seats_taken, migrations.RunPython.noop),
+    ]
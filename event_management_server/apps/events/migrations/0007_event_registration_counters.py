@@ -0,0 +1,65 @@
+# Generated by Django 6.0 on 2026-10-18 04:18
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+COUNTER_FIELDS = {
+    'registered': 'registered_count',
+    'pending': 'pending_count',
+    'checked_in': 'checked_in_count',
+    'not_attended': 'not_attended_count',
+}
+
+
+def backfill_registration_counters(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    EventRegistration = apps.get_model('events', 'EventRegistration')
+
+    def count_of(*statuses):
+        return Coalesce(
+            Subquery(
+                EventRegistration.objects.filter(event=OuterRef('pk'), status__in=statuses)
+                .order_by()
+                .values('event')
+                .annotate(total=Count('id'))
+                .values('total')
+            ),
+            0,
+        )
+
+    Event.objects.update(
+        seats_taken=count_of('registered', 'checked_in'),
+        **{field: count_of(status) for status, field in COUNTER_FIELDS.items()},
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0006_eventregistration_waitlist'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='checked_in_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='not_attended_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='pending_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='registered_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_registration_counters, migrations.RunPython.noop),
+    ]
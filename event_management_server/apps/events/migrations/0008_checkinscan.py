@@ -0,0 +1,26 @@
+# Generated by Django 6.0 on 2026-10-18 04:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0007_event_registration_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CheckInScan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scan_id', models.CharField(max_length=64, unique=True)),
+                ('registration_id', models.BigIntegerField()),
+                ('result', models.CharField(choices=[('checked_in', 'Checked In'), ('already_checked_in', 'Already Checked In'), ('not_registered', 'Not Registered')], max_length=20)),
+                ('scanned_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='check_in_scans', to='events.event')),
+            ],
+        ),
+    ]
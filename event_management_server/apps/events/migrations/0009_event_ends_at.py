@@ -0,0 +1,39 @@
+# Generated by Django 6.0 on 2026-10-18 04:40
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import DateTimeField, ExpressionWrapper, F, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_ends_at(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    Event.objects.update(
+        ends_at=ExpressionWrapper(
+            F('date') + Coalesce(F('duration'), Value(timedelta())),
+            output_field=DateTimeField(),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0008_checkinscan'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='ends_at',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_ends_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('status', 'scheduled')), fields=['ends_at', 'id'], name='event_scheduled_ends_at_idx'),
+        ),
+    ]
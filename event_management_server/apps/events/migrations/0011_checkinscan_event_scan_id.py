@@ -0,0 +1,22 @@
+# Generated by Django 6.0 on 2026-10-18 05:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0010_eventregistration_user_recent_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='checkinscan',
+            name='scan_id',
+            field=models.CharField(max_length=64),
+        ),
+        migrations.AddConstraint(
+            model_name='checkinscan',
+            constraint=models.UniqueConstraint(fields=('event', 'scan_id'), name='check_in_scan_event_scan_id_uniq'),
+        ),
+    ]
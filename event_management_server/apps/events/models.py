@@ -1,9 +1,16 @@
-from data_models.events_models import EventDataModel
+from datetime import timedelta
+
+from data_models.events_models import EVENT_DATE_FORMAT, EventDataModel
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
 
 from apps.accounts.models import User
 
 
+EVENT_SEARCH_CONFIG = "english"
+
+
 class EventStatus(models.TextChoices):
     SCHEDULED = "scheduled"
     COMPLETED = "completed"
@@ -19,6 +26,26 @@ class EventRegistrationStatus(models.TextChoices):
     NOT_ATTENDED = "not_attended"
 
 
+class CheckInResult(models.TextChoices):
+    CHECKED_IN = "checked_in"
+    ALREADY_CHECKED_IN = "already_checked_in"
+    NOT_REGISTERED = "not_registered"
+
+
+# statuses with a denormalized counter on Event, cancelled and rejected
+# registrations are inactive and not counted
+REGISTRATION_COUNTER_FIELDS = {
+    EventRegistrationStatus.REGISTERED: "registered_count",
+    EventRegistrationStatus.PENDING: "pending_count",
+    EventRegistrationStatus.CHECKED_IN: "checked_in_count",
+    EventRegistrationStatus.NOT_ATTENDED: "not_attended_count",
+}
+SEAT_HOLDING_STATUSES = (
+    EventRegistrationStatus.REGISTERED,
+    EventRegistrationStatus.CHECKED_IN,
+)
+
+
 class Event(models.Model):
     title = models.CharField(max_length=255, verbose_name="Title")
     description = models.TextField(blank=True, null=True, verbose_name="Description")
@@ -35,22 +62,58 @@ class Event(models.Model):
         default=EventStatus.SCHEDULED,
     )
     duration = models.DurationField(null=True, blank=True)
+    # date + duration, timestamptz arithmetic is not immutable and cannot be generated
+    ends_at = models.DateTimeField(null=True, editable=False)
     max_capacity = models.PositiveIntegerField(null=True, blank=True)
+    seats_taken = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of registrations holding a seat",
+    )
+    registered_count = models.PositiveIntegerField(default=0, editable=False)
+    pending_count = models.PositiveIntegerField(default=0, editable=False)
+    checked_in_count = models.PositiveIntegerField(default=0, editable=False)
+    not_attended_count = models.PositiveIntegerField(default=0, editable=False)
     is_draft = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector("title", weight="A", config=EVENT_SEARCH_CONFIG)
+            + SearchVector("location", weight="B", config=EVENT_SEARCH_CONFIG)
+            + SearchVector("description", weight="C", config=EVENT_SEARCH_CONFIG)
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     class Meta:
         db_table = "account_category"
+        indexes = [
+            # keyset pagination walks events by id inside the filtered subset
+            models.Index(fields=["status", "id"], name="event_status_id_idx"),
+            models.Index(fields=["organizer", "id"], name="event_organizer_id_idx"),
+            GinIndex(fields=["search_vector"], name="event_search_vector_idx"),
+            # the sweeper only looks for finished events among scheduled ones
+            models.Index(
+                fields=["ends_at", "id"],
+                condition=models.Q(status=EventStatus.SCHEDULED),
+                name="event_scheduled_ends_at_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        self.ends_at = self.date + (self.duration or timedelta())
+        super().save(*args, **kwargs)
+
     def to_pydantic(self) -> EventDataModel:
         duration_minutes = (
             int(self.duration.total_seconds() // 60) if self.duration else None
         )
-        date_str = self.date.strftime("%d %b %Y, %H:%M")
+        date_str = self.date.strftime(EVENT_DATE_FORMAT)
 
         return EventDataModel(
             id=self.id,
@@ -86,9 +149,52 @@ class EventRegistration(models.Model):
     )
     registered_at = models.DateTimeField(auto_now_add=True)
     cancelled_at = models.DateTimeField(null=True, blank=True)
+    waitlisted_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         unique_together = ("event", "user")
+        indexes = [
+            # head of the waitlist is a single index lookup
+            models.Index(
+                fields=["event", "waitlisted_at", "id"],
+                condition=models.Q(status=EventRegistrationStatus.PENDING),
+                name="registration_waitlist_idx",
+            ),
+            # registrations of a user, latest first
+            models.Index(
+                fields=["user", "registered_at", "id"],
+                name="registration_user_recent_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user} -> {self.event} ({self.status})"
+
+
+class CheckInScan(models.Model):
+    """
+    Processed scan of a door scanner, scanners resend batches
+    with the same scan IDs and get the stored results back.
+    Scan IDs are unique per event
+    """
+
+    scan_id = models.CharField(max_length=64)
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        related_name="check_in_scans",
+    )
+    registration_id = models.BigIntegerField()
+    result = models.CharField(max_length=20, choices=CheckInResult.choices)
+    scanned_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["event", "scan_id"], name="check_in_scan_event_scan_id_uniq"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.scan_id} -> {self.registration_id} ({self.result})"
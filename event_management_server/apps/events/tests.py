@@ -0,0 +1,83 @@
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.events.models import Event, EventRegistration, EventRegistrationStatus
+from services.db_handlers.events_handler import EventsHandler
+
+# savepoint of the handler transaction, event row lock, the state change
+# statement and the savepoint release
+STATE_CHANGE_QUERIES = 4
+
+
+class RegistrationQueriesTestCase(TestCase):
+    """
+    Registration state changes are written by a single statement
+    after the event row lock
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = cls._create_user("organizer")
+        cls.first_user = cls._create_user("first")
+        cls.second_user = cls._create_user("second")
+        cls.event = Event.objects.create(
+            title="Event",
+            date=timezone.now() + timezone.timedelta(days=1),
+            location="Address",
+            organizer=cls.organizer,
+            max_capacity=1,
+        )
+
+    @staticmethod
+    def _create_user(name: str) -> User:
+        return User.objects.create_user(
+            email=f"{name}@example.com",
+            password="password",
+            first_name=name,
+            last_name=name,
+            phone_number="+380501234567",
+        )
+
+    def _get_status(self, user: User) -> str:
+        return EventRegistration.objects.get(event=self.event, user=user).status
+
+    def _assert_counters(self, seats_taken: int, registered: int, pending: int):
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_taken, seats_taken)
+        self.assertEqual(self.event.registered_count, registered)
+        self.assertEqual(self.event.pending_count, pending)
+
+    def test_register(self):
+        with self.assertNumQueries(STATE_CHANGE_QUERIES):
+            registration = EventsHandler.register_user(self.first_user, self.event.id)
+
+        self.assertEqual(registration.status, EventRegistrationStatus.REGISTERED)
+        self._assert_counters(seats_taken=1, registered=1, pending=0)
+
+    def test_register_after_cancel(self):
+        EventsHandler.register_user(self.first_user, self.event.id)
+        EventsHandler.cancel_registration(self.first_user, self.event.id)
+
+        with self.assertNumQueries(STATE_CHANGE_QUERIES):
+            registration = EventsHandler.register_user(self.first_user, self.event.id)
+
+        self.assertEqual(registration.status, EventRegistrationStatus.REGISTERED)
+        self.assertEqual(EventRegistration.objects.count(), 1)
+        self._assert_counters(seats_taken=1, registered=1, pending=0)
+
+    def test_cancel_with_promotion(self):
+        EventsHandler.register_user(self.first_user, self.event.id)
+        EventsHandler.register_user(self.second_user, self.event.id)
+        self._assert_counters(seats_taken=1, registered=1, pending=1)
+
+        with self.assertNumQueries(STATE_CHANGE_QUERIES):
+            registration = EventsHandler.cancel_registration(
+                self.first_user, self.event.id
+            )
+
+        self.assertEqual(registration.status, EventRegistrationStatus.CANCELLED)
+        self.assertEqual(
+            self._get_status(self.second_user), EventRegistrationStatus.REGISTERED
+        )
+        self._assert_counters(seats_taken=1, registered=1, pending=0)
@@ -3,6 +3,8 @@ from typing import Optional
 
 from pydantic import BaseModel, Field
 
+EVENT_DATE_FORMAT = "%d %b %Y, %H:%M"
+
 
 class EventDataModel(BaseModel):
     id: int = Field(..., description="Event ID")
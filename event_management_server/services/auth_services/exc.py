@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Dict, Optional
 
 from api.api_core.utils.exceptions import CustomBaseException
 
@@ -56,6 +56,16 @@ class UnknownServerError(AuthError):
             self.detail += message
 
 
+class PasswordHashingBusyError(CustomBaseException):
+    code = 503
+    title = "Server busy"
+    detail = "Too many sign-ins at the moment, try again shortly."
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Retry-After": "1"}
+
+
 class SecretTokenRequired(CustomBaseException):
     code = 403
     title = "Access Denied"
@@ -1,138 +1,110 @@
-from typing import Any
+import time
+from typing import Any, List, Optional
 
 from services.cache.cache import CacheHandler
 from services.auth_services.exc import LoggedOutTokenError
+from services.auth_services.session_scripts import (
+    CLEAR_SESSIONS_SCRIPT,
+    SAVE_SESSION_SCRIPT,
+    UPDATE_SESSION_SCRIPT,
+)
+
+DEFAULT_MAX_SESSIONS = 10
 
 
 class JWTCacheHandler:
-    key_template_access = "user_{id}_access_tokens"
-    key_template_refresh = "user_{id}_refresh_tokens"
+    """
+    Sessions of a user are kept in a sorted set of session ids scored by
+    their expiry, so membership is a single ZSCORE and stale sessions are
+    pruned by score. Both tokens of a pair carry the id of their session.
+    A user keeps at most `max_sessions` sessions, the oldest are evicted first.
+    Session changes run as scripts, atomically and in a single round-trip
+    """
+
+    key_template_sessions = "user_{id}_sessions"
 
-    def __init__(self, cache: CacheHandler):
+    def __init__(
+        self,
+        cache: CacheHandler,
+        ttl_session: int,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+    ):
         if not isinstance(cache, CacheHandler):
             raise TypeError(
                 f"Variable cache should be instance of Cache and not {type(cache)}"
             )
         self.cache = cache
+        self.ttl_session = ttl_session
+        self.max_sessions = max_sessions
 
-    def save_to_cache_pairs(
-        self, user_identifier: Any, access_token: str, refresh_token: str, ttl: int = 0
-    ):
-        self.cache.lpush(
-            self.key_template_access.format(id=user_identifier), access_token
-        )
-        self.cache.lpush(
-            self.key_template_refresh.format(id=user_identifier), refresh_token
-        )
-        self.cache.set(access_token, refresh_token)
-        self.cache.set(refresh_token, access_token)
-        if ttl:
-            self.cache.expire(access_token, ttl)
-            self.cache.expire(refresh_token, ttl)
+    def _get_sessions_key(self, user_identifier: Any) -> str:
+        return self.key_template_sessions.format(id=user_identifier)
 
-    def update_token_pairs(
-        self,
-        user_identifier: Any,
-        old_token: str,
-        access_token: str,
-        refresh_token: str,
-        ttl: int = 0,
-        is_access_token: bool = False,
-    ):
-        if is_access_token:
-            old_access_token = old_token
-            if (
-                pos_old_acc := self.cache.lpos(
-                    self.key_template_access.format(id=user_identifier),
-                    old_access_token,
-                )
-            ) is None:
-                raise LoggedOutTokenError()
-            old_refresh_token = self.cache.get(old_access_token)
-            pos_old_ref = self.cache.lpos(
-                self.key_template_refresh.format(id=user_identifier), old_access_token
-            )
-        else:
-            old_refresh_token = old_token
-            if (
-                pos_old_ref := self.cache.lpos(
-                    self.key_template_refresh.format(id=user_identifier),
-                    old_refresh_token,
-                )
-            ) is None:
-                raise LoggedOutTokenError()
-            old_access_token = self.cache.get(old_refresh_token)
-            # remove tokens
-            pos_old_acc = self.cache.lpos(
-                self.key_template_access.format(id=user_identifier), old_access_token
-            )
-        if pos_old_acc:
-            self.cache.lrem(
-                self.key_template_access.format(id=user_identifier), 1, pos_old_acc
-            )
-        if pos_old_ref:
-            self.cache.lrem(
-                self.key_template_refresh.format(id=user_identifier), 1, pos_old_ref
-            )
-        self.cache.delete(old_refresh_token)
-        self.cache.delete(old_access_token)
-        self.save_to_cache_pairs(
-            user_identifier=user_identifier,
-            access_token=access_token,
-            refresh_token=refresh_token,
-            ttl=ttl,
+    def save_session(
+        self, user_identifier: Any, session_id: str, ttl: Optional[int] = None
+    ) -> List[str]:
+        """
+        Start a session
+        :return: ids of the sessions evicted over the cap
+        """
+        return self.cache.run_script(
+            SAVE_SESSION_SCRIPT,
+            keys=[self._get_sessions_key(user_identifier)],
+            args=[
+                session_id,
+                time.time(),
+                ttl or self.ttl_session,
+                self.max_sessions,
+            ],
         )
 
-    def clear_other_sessions(self, user_identifier: Any, access_token: str):
-        def remove_tokens_from_list(key: str):
-            for token in self.cache.lrange(key, 0, -1):
-                self.cache.delete(token)
-            self.cache.delete(key)
-
-        if (
-            self.cache.lpos(
-                self.key_template_access.format(id=user_identifier), access_token
-            )
-            is None
-        ):
+    def update_session(
+        self, user_identifier: Any, old_session_id: str, session_id: str
+    ) -> List[str]:
+        """
+        Replace the session `old_session_id` with a new one
+        :return: ids of the sessions evicted over the cap
+        :exception LoggedOutTokenError: if the old session has ended
+        """
+        evicted = self.cache.run_script(
+            UPDATE_SESSION_SCRIPT,
+            keys=[self._get_sessions_key(user_identifier)],
+            args=[
+                old_session_id,
+                session_id,
+                time.time(),
+                self.ttl_session,
+                self.max_sessions,
+            ],
+        )
+        if evicted is None:
             raise LoggedOutTokenError()
-        refresh_token = self.cache.get(access_token)
-        remove_tokens_from_list(self.key_template_access.format(id=user_identifier))
-        remove_tokens_from_list(self.key_template_refresh.format(id=user_identifier))
+        return evicted
 
-        self.save_to_cache_pairs(
-            user_identifier, access_token=access_token, refresh_token=refresh_token
+    def clear_sessions(self, user_identifier: Any, session_id: str) -> List[str]:
+        """
+        End every session of the user, `session_id` included
+        :return: ids of the ended sessions
+        :exception LoggedOutTokenError: if the session has ended
+        """
+        ended = self.cache.run_script(
+            CLEAR_SESSIONS_SCRIPT,
+            keys=[self._get_sessions_key(user_identifier)],
+            args=[session_id, time.time()],
         )
-
-    def verify_token(
-        self, user_identifier: Any, token: str, is_access_token: bool = True
-    ):
-        if self.cache.get(token) is None:
-            raise LoggedOutTokenError()
-        if (
-            is_access_token
-            and self.cache.lpos(
-                self.key_template_access.format(id=user_identifier), token
-            )
-            is None
-        ):
-            raise LoggedOutTokenError()
-        elif (
-            not is_access_token
-            and self.cache.lpos(
-                self.key_template_refresh.format(id=user_identifier), token
-            )
-            is None
-        ):
+        if ended is None:
             raise LoggedOutTokenError()
+        return ended
 
-    def delete_pairs_tokens(self, user_identifier: Any, access_token: str):
-        refresh_token = self.cache.get(access_token)
-        self.cache.delete(refresh_token)
-        self.cache.delete(access_token)
-        self.cache.lrem(
-            self.key_template_access.format(id=user_identifier), 0, access_token
-        )
-        self.cache.lrem(
-            self.key_template_refresh.format(id=user_identifier), 0, refresh_token
+    def verify_session(self, user_identifier: Any, session_id: str):
+        """
+        :exception LoggedOutTokenError: if the session has ended
+        """
+        expires_at = self.cache.zscore(
+            self._get_sessions_key(user_identifier), session_id
         )
+        if expires_at is None or expires_at <= time.time():
+            raise LoggedOutTokenError()
+
+    def delete_session(self, user_identifier: Any, session_id: str):
+        self.cache.zrem(self._get_sessions_key(user_identifier), session_id)
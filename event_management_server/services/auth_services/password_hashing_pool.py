@@ -0,0 +1,104 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from logging import Logger, getLogger
+from threading import Lock
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from django.contrib.auth.hashers import make_password, verify_password
+
+from services.auth_services.exc import PasswordHashingBusyError
+
+DEFAULT_LOGGER = getLogger(__name__)
+
+
+class PasswordHashingPool:
+    """
+    Runs password hashing in a pool of threads, off the event loop and off
+    the thread of sync views. PBKDF2 of hashlib releases the GIL, so the
+    workers hash in parallel while the other requests are served.
+    At most `max_workers` hashes run and `max_queue` wait, calls over that
+    are rejected at once with PasswordHashingBusyError instead of piling up
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        max_queue: int,
+        logger: Optional[Logger] = None,
+    ):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._logger = logger or DEFAULT_LOGGER
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password_hashing"
+        )
+        self._lock = Lock()
+        self._in_flight = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_time = 0.0
+        self._max_wait_time = 0.0
+        self._run_time = 0.0
+
+    def _admit(self):
+        with self._lock:
+            if self._in_flight < self.max_workers + self.max_queue:
+                self._in_flight += 1
+                return
+            self._rejected += 1
+            rejected = self._rejected
+        # logged at most once per 100 rejections
+        if rejected % 100 == 1:
+            self._logger.warning("PasswordHashingPool: busy, %s", self.stats())
+        raise PasswordHashingBusyError()
+
+    def _run(self, submitted_at: float, func: Callable, *args) -> Any:
+        started_at = time.monotonic()
+        with self._lock:
+            self._running += 1
+            wait_time = started_at - submitted_at
+            self._wait_time += wait_time
+            self._max_wait_time = max(self._max_wait_time, wait_time)
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._in_flight -= 1
+                self._completed += 1
+                self._run_time += time.monotonic() - started_at
+
+    async def run(self, func: Callable, *args) -> Any:
+        """
+        Run `func` in the pool
+        :exception PasswordHashingBusyError: if the queue is full
+        """
+        self._admit()
+        # the slot is released by the worker, a cancelled request keeps it
+        # until its hash is done
+        future = self._executor.submit(self._run, time.monotonic(), func, *args)
+        return await asyncio.wrap_future(future)
+
+    async def make_password(self, password: str) -> str:
+        return await self.run(make_password, password)
+
+    async def verify_password(self, password: str, encoded: str) -> Tuple[bool, bool]:
+        """
+        :return: whether the password matches, whether its hash must be updated
+        """
+        return await self.run(verify_password, password, encoded)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            started = max(self._completed + self._running, 1)
+            return {
+                "running": self._running,
+                "queued": self._in_flight - self._running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(self._wait_time / started * 1000, 2),
+                "max_wait_ms": round(self._max_wait_time * 1000, 2),
+                "avg_run_ms": round(self._run_time / max(self._completed, 1) * 1000, 2),
+            }
@@ -0,0 +1,31 @@
+from typing import Any, Dict
+
+from django.contrib.auth import get_user_model
+
+from api.api_core.utils.exceptions import UserDoesNotExistError
+
+
+class AuthPrincipal:
+    """
+    Authenticated caller of a request, set to `request.auth`.
+    Holds the verified token with its decoded claims, the user is loaded
+    on first access and reused for the rest of the request
+    """
+
+    def __init__(self, token: str, claims: Dict[str, Any], user_identifier: Any):
+        self.token = token
+        self.claims = claims
+        self.user_identifier = user_identifier
+        self._user = None
+
+    @property
+    def user(self):
+        """
+        :exception UserDoesNotExistError: if the user of the token was deleted
+        """
+        if self._user is None:
+            user = get_user_model().objects.filter(id=self.user_identifier).first()
+            if user is None:
+                raise UserDoesNotExistError()
+            self._user = user
+        return self._user
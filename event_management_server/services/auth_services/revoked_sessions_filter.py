@@ -0,0 +1,221 @@
+import hashlib
+import math
+import os
+import time
+from logging import Logger, getLogger
+from threading import Lock, Thread
+from typing import Dict, List, Optional, Set
+
+from services.cache.cache import CacheHandler
+
+DEFAULT_LOGGER = getLogger(__name__)
+DEFAULT_REVOKED_SESSIONS_KEY_PREFIX = "revoked_sessions"
+
+# KEYS: filter, version. ARGV: ttl, bit offsets.
+# Returns the new version of the filters
+_REVOKE_SCRIPT = """
+for i = 2, #ARGV do
+    redis.call('SETBIT', KEYS[1], ARGV[i], 1)
+end
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return redis.call('INCR', KEYS[2])
+"""
+
+
+class BloomFilter:
+    """
+    Bit array where an item sets `hashes` bits. The bit order is the one of
+    redis SETBIT, so a redis bitmap can be loaded as is
+    """
+
+    def __init__(self, size: int, hashes: int, bits: Optional[bytes] = None):
+        self.size = size
+        self.hashes = hashes
+        self.bits = bytearray((size + 7) // 8)
+        if bits:
+            self.bits[: len(bits)] = bits[: len(self.bits)]
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float) -> "BloomFilter":
+        size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        return cls(size, hashes=max(1, round(size / capacity * math.log(2))))
+
+    def get_positions(self, item: str) -> List[int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "big")
+        step = int.from_bytes(digest[8:], "big") | 1
+        return [(first + i * step) % self.size for i in range(self.hashes)]
+
+    def add_positions(self, positions: List[int]):
+        for position in positions:
+            self.bits[position >> 3] |= 0x80 >> (position & 7)
+
+    def has_positions(self, positions: List[int]) -> bool:
+        return all(
+            self.bits[position >> 3] & (0x80 >> (position & 7))
+            for position in positions
+        )
+
+    def add(self, item: str):
+        self.add_positions(self.get_positions(item))
+
+    def __contains__(self, item: str) -> bool:
+        return self.has_positions(self.get_positions(item))
+
+
+class RevokedSessionsFilter:
+    """
+    Bloom filter of revoked session ids shared by workers through redis.
+    A revocation sets bits of the current generation bitmap in redis and in
+    the local copy. The first check of a worker waits for the bitmaps to be
+    loaded, then a background thread reloads them when their version changed,
+    every `sync_interval`, and keeps the last copy if redis is down, so later
+    checks never wait for redis.
+    Only access tokens are checked, refresh tokens are checked against the
+    session set when they are used. A generation spans `ttl`, the access
+    token lifetime, so the current and the previous generations hold every
+    revocation that still matters.
+    Up to `capacity` revocations per generation, a live session is taken
+    for a revoked one with probability `error_rate`
+    """
+
+    def __init__(
+        self,
+        cache: CacheHandler,
+        ttl: int,
+        capacity: int = 1_000_000,
+        error_rate: float = 0.001,
+        sync_interval: float = 5,
+        key_prefix: str = DEFAULT_REVOKED_SESSIONS_KEY_PREFIX,
+        logger: Optional[Logger] = None,
+    ):
+        if not isinstance(cache, CacheHandler):
+            raise TypeError(
+                f"Variable cache should be instance of Cache and not {type(cache)}"
+            )
+        self.cache = cache
+        self.ttl = ttl
+        self.sync_interval = sync_interval
+        self.key_prefix = key_prefix
+        self._logger = logger or DEFAULT_LOGGER
+        self._template = BloomFilter.for_capacity(capacity, error_rate)
+        self._lock = Lock()
+        self._first_sync_lock = Lock()
+        # generation -> local copy of its bitmap
+        self._filters: Dict[int, BloomFilter] = {}
+        # past generations loaded once they stopped changing
+        self._sealed: Set[int] = set()
+        self._version = None
+        # pid of the process whose copy is loaded, forked workers load their own
+        self._synced_pid = None
+        self._sync_thread = None
+        self._sync_pid = None
+
+    def _get_generation(self) -> int:
+        return int(time.time() // self.ttl)
+
+    def _get_filter_key(self, generation: int) -> str:
+        return f"{self.key_prefix}_{generation}"
+
+    def _get_version_key(self) -> str:
+        return f"{self.key_prefix}_version"
+
+    def _new_filter(self, bits: Optional[bytes] = None) -> BloomFilter:
+        return BloomFilter(self._template.size, self._template.hashes, bits)
+
+    def _is_syncing(self) -> bool:
+        # forked workers do not inherit the sync thread of the parent
+        return (
+            self._sync_pid == os.getpid()
+            and self._sync_thread is not None
+            and self._sync_thread.is_alive()
+        )
+
+    def _ensure_syncing(self):
+        if self._is_syncing():
+            return
+        with self._lock:
+            if self._is_syncing():
+                return
+            self._sync_thread = Thread(
+                target=self._sync_forever, name="revoked_sessions_sync", daemon=True
+            )
+            self._sync_pid = os.getpid()
+            self._sync_thread.start()
+
+    def _ensure_synced(self):
+        if self._synced_pid == os.getpid():
+            return
+        with self._first_sync_lock:
+            if self._synced_pid != os.getpid():
+                self.sync()
+
+    def _sync_forever(self):
+        while True:
+            self.sync()
+            time.sleep(self.sync_interval)
+
+    def sync(self):
+        """
+        Reload the bitmaps of live generations if any worker revoked since.
+        The previous generation is loaded once more after it stopped changing,
+        after that only the current one is reloaded
+        """
+        started_at = time.time()
+        generation = self._get_generation()
+        try:
+            version = self.cache.get(self._get_version_key())
+            if version == self._version and generation in self._filters:
+                self._synced_pid = os.getpid()
+                return
+            filters = {}
+            for live_generation in (generation - 1, generation):
+                if live_generation in self._sealed:
+                    filters[live_generation] = self._filters[live_generation]
+                    continue
+                filters[live_generation] = self._new_filter(
+                    self.cache.get_raw(self._get_filter_key(live_generation))
+                )
+        except Exception:  # noqa
+            self._logger.warning("RevokedSessionsFilter: sync failed", exc_info=True)
+            return
+        # revocations of workers still in the previous generation are let in
+        sealed = set()
+        if started_at - generation * self.ttl > self.sync_interval:
+            sealed.add(generation - 1)
+        with self._lock:
+            self._filters = filters
+            self._sealed = sealed
+            self._version = version
+            self._synced_pid = os.getpid()
+
+    def revoke(self, *session_ids: str):
+        if not session_ids:
+            return
+        generation = self._get_generation()
+        positions = []
+        for session_id in session_ids:
+            positions.extend(self._template.get_positions(session_id))
+        self.cache.run_script(
+            _REVOKE_SCRIPT,
+            keys=[self._get_filter_key(generation), self._get_version_key()],
+            args=[self.ttl * 2, *positions],
+        )
+        with self._lock:
+            if generation not in self._filters:
+                self._filters[generation] = self._new_filter()
+            self._filters[generation].add_positions(positions)
+
+    def is_revoked(self, session_id: str) -> bool:
+        # a worker never answers from empty bitmaps, until its first sync
+        # succeeds every check retries it
+        self._ensure_synced()
+        self._ensure_syncing()
+        positions = self._template.get_positions(session_id)
+        generation = self._get_generation()
+        with self._lock:
+            return any(
+                self._filters[live_generation].has_positions(positions)
+                for live_generation in (generation - 1, generation)
+                if live_generation in self._filters
+            )
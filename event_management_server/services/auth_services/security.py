@@ -1,15 +1,23 @@
 import uuid
 import datetime
+import secrets
 import jwt
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, List, Tuple
 from pydantic import BaseModel, Field
 from services.singleton import SingletonMeta
-from services.auth_services.jwt_cache_handler import JWTCacheHandler
+from services.auth_services.jwt_cache_handler import (
+    DEFAULT_MAX_SESSIONS,
+    JWTCacheHandler,
+)
+from services.auth_services.revoked_sessions_filter import RevokedSessionsFilter
+from services.auth_services.signing_keys import SigningKeySet
+from services.auth_services.verified_tokens_cache import VerifiedTokensCache
 from services.cache.cache import CacheHandler
 from services.auth_services.exc import (
     IncorrectPathInEncodedDataError,
     IncorrectTokenError,
     IncorrectTokenTypeError,
+    LoggedOutTokenError,
     TTLTokenExpiredError,
 )
 
@@ -19,13 +27,21 @@ DEFAULT_TTL_REFRESH_TOKEN = 1209600
 
 
 class JWTHandlerConfig(BaseModel):
-    is_use_cache: bool = Field(True, description="Is use cache for save tokens")
+    is_use_cache: bool = Field(
+        True,
+        description="Is verify sessions of tokens by cache."
+        " Otherwise tokens are verified locally against revoked sessions",
+    )
     ttl_access_token: int = Field(
         DEFAULT_TTL_ACCESS_TOKEN, description="How to long live access token"
     )
     ttl_refresh_token: int = Field(
         DEFAULT_TTL_REFRESH_TOKEN, description="How to long live refresh token"
     )
+    max_sessions: int = Field(
+        DEFAULT_MAX_SESSIONS,
+        description="How many sessions a user keeps, the oldest are evicted",
+    )
     secret: str = Field(str(uuid.uuid4()), description="Secret jwt tokens")
     algorithm: str = Field("HS256", description="Algorithm encoding jwt tokens")
     user_identifier_in_user_data: str = Field(
@@ -39,11 +55,20 @@ class JWTHandlerConfig(BaseModel):
 
 class JWTHandler(metaclass=SingletonMeta):
     """
-    JWTHandler class for checking the validity of sessions
+    JWTHandler class for checking the validity of sessions.
+    Tokens carry compact claims only: the subject, the session id,
+    the token type and the expiry. Profile data is loaded on demand.
+    Sessions are kept in the cache, which checks them on every verification
+    unless `is_use_cache` is off. Then verification is stateless, revoked
+    sessions are looked up in a filter synced from the cache.
+    With `signing_keys` tokens are signed by an asymmetric key of the set
+    instead of the secret, so they can be verified by its public JWKS
     """
 
-    _access_token_type: str = "access_token"
-    _refresh_token_type: str = "refresh_token"
+    _access_token_type: str = "a"
+    _refresh_token_type: str = "r"
+    # the `typ` header is dropped, tokens are told apart by the `typ` claim
+    _token_headers: Dict[str, Any] = {"typ": None}
     _cache_handler: JWTCacheHandler = None
     _is_use_cache: bool
 
@@ -51,25 +76,51 @@ class JWTHandler(metaclass=SingletonMeta):
         self,
         config: Optional[JWTHandlerConfig] = None,
         cache: Optional[CacheHandler] = None,
+        verified_tokens: Optional[VerifiedTokensCache] = None,
+        revoked_sessions: Optional[RevokedSessionsFilter] = None,
+        signing_keys: Optional[SigningKeySet] = None,
     ):
         self._config = config
+        self._signing_keys = signing_keys
         self._is_use_cache = False
+        self._verified_tokens = verified_tokens
+        self._revoked_sessions = revoked_sessions
 
         if cache:
-            self._is_use_cache = True
-            self._cache_handler = JWTCacheHandler(cache)
+            config = config or JWTHandlerConfig()
+            self._is_use_cache = config.is_use_cache
+            self._cache_handler = JWTCacheHandler(
+                cache,
+                ttl_session=config.ttl_refresh_token,
+                max_sessions=config.max_sessions,
+            )
+
+    def _revoke_sessions(self, session_ids: List[str]):
+        if not session_ids:
+            return
+        if self._verified_tokens:
+            self._verified_tokens.revoke_sessions(*session_ids)
+        if not self._is_use_cache and self._revoked_sessions:
+            self._revoked_sessions.revoke(*session_ids)
+
+    @staticmethod
+    def _generate_session_id() -> str:
+        return secrets.token_urlsafe(12)
 
     def _encode_token(
         self,
-        data: Dict[str, Any],
+        subject: str,
+        session_id: str,
         token_type: str,
         exp: datetime.datetime,
         headers: Optional[Dict[str, Any]] = None,
     ) -> str:
         """
         Generate jwt token
-        :param data: serialized user data
-        :type data: Dict[str, Any]
+        :param subject: user identifier
+        :type subject: str
+        :param session_id: id of the session of the token pair
+        :type session_id: str
         :param token_type: one of token type
         :type token_type: str
         :param exp: time expired token
@@ -80,34 +131,52 @@ class JWTHandler(metaclass=SingletonMeta):
         :rtype: str
         """
         payload = {
-            "type": token_type,
+            "sub": subject,
+            "sid": session_id,
+            "typ": token_type,
             "exp": exp,
-            "sub": str(data[self._config.user_identifier_in_user_data]),
-            "user_data": data,
-            "uuid": str(uuid.uuid4()),
         }
-        
+        headers = {**self._token_headers, **(headers or {})}
+        key, algorithm = self._config.secret, self._config.algorithm
+        if self._signing_keys:
+            headers["kid"], key = self._signing_keys.get_signing_key()
+            algorithm = self._signing_keys.algorithm
         return jwt.encode(
             payload=payload,
-            key=self._config.secret,
-            algorithm=self._config.algorithm,
+            key=key,
+            algorithm=algorithm,
             headers=headers,
         )
 
     def _decode_token(self, token: str, verify: bool = True) -> Dict[str, Any]:
         """
         Decode information from token
+        :exception jwt.InvalidSignatureError: if signed by an unknown key
         """
+        key, algorithm = self._config.secret, self._config.algorithm
+        if self._signing_keys:
+            key = self._signing_keys.get_verification_key(
+                jwt.get_unverified_header(token).get("kid")
+            )
+            algorithm = self._signing_keys.algorithm
         return jwt.decode(
             token,
-            key=self._config.secret,
+            key=key,
             algorithms=[
-                self._config.algorithm,
+                algorithm,
             ],
-            verify=verify,
+            options={"verify_signature": verify},
         )
 
-    def get_subject(self, token: str) -> Dict[str, Any]:
+    def get_jwks(self) -> Dict[str, Any]:
+        """
+        JWKS document of the keys verifying tokens, empty for a shared secret
+        """
+        if self._signing_keys:
+            return self._signing_keys.jwks
+        return {"keys": []}
+
+    def get_subject(self, token: str) -> str:
         return self._decode_token(token, verify=False)["sub"]
 
     @staticmethod
@@ -124,20 +193,30 @@ class JWTHandler(metaclass=SingletonMeta):
         )
 
     def _get_access_token(
-        self, subject_user, headers: Optional[Dict[str, Any]] = None, ttl: int = None
+        self,
+        subject: str,
+        session_id: str,
+        headers: Optional[Dict[str, Any]] = None,
+        ttl: int = None,
     ) -> str:
         return self._encode_token(
-            subject_user,
+            subject,
+            session_id,
             self._access_token_type,
             exp=self._get_expired_datetime(ttl or self._config.ttl_access_token),
             headers=headers,
         )
 
     def _get_refresh_token(
-        self, subject_user, headers: Optional[Dict[str, Any]] = None, ttl: int = None
+        self,
+        subject: str,
+        session_id: str,
+        headers: Optional[Dict[str, Any]] = None,
+        ttl: int = None,
     ) -> str:
         return self._encode_token(
-            subject_user,
+            subject,
+            session_id,
             self._refresh_token_type,
             exp=self._get_expired_datetime(ttl or self._config.ttl_refresh_token),
             headers=headers,
@@ -150,7 +229,7 @@ class JWTHandler(metaclass=SingletonMeta):
         Extract user identifier from provided data
         :param subject_user: provided user data
         :type subject_user: dict
-        :param token:
+        :param token: token, its subject is the user identifier
         :type token: str
         :return: user identifier
         :exception UserDataForGenerateToken: if provided incorrect
@@ -158,9 +237,7 @@ class JWTHandler(metaclass=SingletonMeta):
         :exception AttributeError: if not provided data for execution
         """
         if token:
-            # subject_user = self.get_subject(token)
-            payload = self._decode_token(token, verify=False)
-            subject_user = payload.get("user_data")
+            return self.get_subject(token)
         if not subject_user:
             raise AttributeError("Should be provided `token` or `subject_user`")
         deep_path = self._config.user_identifier_in_user_data.split(".")
@@ -169,6 +246,19 @@ class JWTHandler(metaclass=SingletonMeta):
                 raise IncorrectPathInEncodedDataError()
         return subject_user
 
+    def _generate_session_tokens(
+        self,
+        subject: str,
+        session_id: str,
+        headers: Optional[Dict[str, Any]] = None,
+        ttl_access: int = None,
+        ttl_refresh: int = None,
+    ) -> Tuple[str, str]:
+        return (
+            self._get_access_token(subject, session_id, headers, ttl=ttl_access),
+            self._get_refresh_token(subject, session_id, headers, ttl=ttl_refresh),
+        )
+
     def generate_token_pairs(
         self,
         subject_user: Dict[str, Any],
@@ -176,7 +266,7 @@ class JWTHandler(metaclass=SingletonMeta):
         ttl_access: int = None,
         ttl_refresh: int = None,
     ) -> Tuple[str, str]:
-        """Generate pair tokens
+        """Generate pair tokens of a new session
 
         Args:
             subject_user (Dict[str, Any]): The user data
@@ -186,78 +276,95 @@ class JWTHandler(metaclass=SingletonMeta):
         Returns:
             Tuple[str, str]: pair tokens
         """
-        access_token = self._get_access_token(subject_user, headers, ttl=ttl_access)
-        refresh_token = self._get_refresh_token(subject_user, headers, ttl=ttl_refresh)
-        if self._is_use_cache and self._cache_handler:
-            user_identifier = self.get_user_identifier(subject_user=subject_user)
-            self._cache_handler.save_to_cache_pairs(
-                user_identifier,
-                access_token,
-                refresh_token,
-                ttl=self._config.ttl_refresh_token,
+        subject = str(self.get_user_identifier(subject_user=subject_user))
+        session_id = self._generate_session_id()
+        access_token, refresh_token = self._generate_session_tokens(
+            subject, session_id, headers, ttl_access, ttl_refresh
+        )
+        if self._cache_handler:
+            evicted = self._cache_handler.save_session(
+                subject, session_id, ttl=ttl_refresh
             )
+            self._revoke_sessions(evicted)
         return access_token, refresh_token
 
     def update_token_pairs(
         self,
-        subject_user: Dict[str, Any],
         old_token: str,
         headers: Optional[Dict[str, Any]] = None,
         is_access_token: bool = False,
-    ):
-        self.verify_token(old_token, is_access_token=is_access_token)
-        access_token = self._get_access_token(subject_user, headers)
-        refresh_token = self._get_refresh_token(subject_user, headers)
-
-        if self._is_use_cache and self._cache_handler:
-            user_identifier = self.get_user_identifier(subject_user=subject_user)
+        claims: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[str, str]:
+        """
+        Replace the session of `old_token` with a new one.
+        `claims` of a token already verified by the caller skip decoding,
+        the session is checked by the cache anyway
+        """
+        if claims is None:
+            claims = self.verify_token(old_token, is_access_token=is_access_token)
+        subject = claims["sub"]
+        session_id = self._generate_session_id()
+        access_token, refresh_token = self._generate_session_tokens(
+            subject, session_id, headers
+        )
 
-            self._cache_handler.update_token_pairs(
-                user_identifier=user_identifier,
-                old_token=old_token,
-                access_token=access_token,
-                refresh_token=refresh_token,
-                ttl=self._config.ttl_refresh_token,
-                is_access_token=is_access_token,
+        if self._cache_handler:
+            evicted = self._cache_handler.update_session(
+                subject, old_session_id=claims["sid"], session_id=session_id
             )
+            self._revoke_sessions([claims["sid"], *evicted])
         return access_token, refresh_token
 
-    def verify_token(self, token: str, is_access_token: bool = True):
+    def verify_token(self, token: str, is_access_token: bool = True) -> Dict[str, Any]:
         """
         Method for verify token
         :param token:
         :param is_access_token:
+        :return: decoded claims of the token
         :exception:
         """
+        token_type = self._refresh_token_type
+        if is_access_token:
+            token_type = self._access_token_type
+        if is_access_token and self._verified_tokens:
+            data = self._verified_tokens.get(token)
+            if data is not None:
+                if data.get("typ") != token_type:
+                    raise IncorrectTokenTypeError()
+                return data
+
         try:
             data = self._decode_token(token)
-            token_type = self._refresh_token_type
-            if is_access_token:
-                token_type = self._access_token_type
-            if data["type"] != token_type:
+            if data.get("typ") != token_type:
                 raise IncorrectTokenTypeError()
-            if self._is_use_cache and self._cache_handler:
-                user_identifier = self.get_user_identifier(token=token)
-                self._cache_handler.verify_token(
-                    user_identifier=user_identifier,
-                    token=token,
-                    is_access_token=is_access_token,
-                )
+            if self._is_use_cache:
+                self._cache_handler.verify_session(data["sub"], data["sid"])
+            elif (
+                is_access_token
+                and self._revoked_sessions
+                and self._revoked_sessions.is_revoked(data["sid"])
+            ):
+                # refresh tokens are checked by the session set on refresh
+                raise LoggedOutTokenError()
         except (jwt.InvalidSignatureError, jwt.DecodeError):
             raise IncorrectTokenError()
         except jwt.ExpiredSignatureError:
             raise TTLTokenExpiredError()
+        if is_access_token and self._verified_tokens:
+            self._verified_tokens.put(token, data["sub"], data)
+        return data
 
-    def logout_other_users(self, access_token: str):
-        if self._is_use_cache and self._cache_handler:
-            user_identifier = self.get_user_identifier(token=access_token)
-            self._cache_handler.clear_other_sessions(
-                user_identifier=user_identifier, access_token=access_token
-            )
+    def logout_everywhere(self, access_token: str):
+        if self._cache_handler:
+            claims = self._decode_token(access_token, verify=False)
+            ended = self._cache_handler.clear_sessions(claims["sub"], claims["sid"])
+            if self._verified_tokens:
+                self._verified_tokens.revoke_user(claims["sub"])
+            if not self._is_use_cache and self._revoked_sessions:
+                self._revoked_sessions.revoke(*ended)
 
     def logout_user(self, access_token: str):
-        if self._is_use_cache and self._cache_handler:
-            user_identifier = self.get_user_identifier(token=access_token)
-            self._cache_handler.delete_pairs_tokens(
-                user_identifier=user_identifier, access_token=access_token
-            )
+        if self._cache_handler:
+            claims = self._decode_token(access_token, verify=False)
+            self._cache_handler.delete_session(claims["sub"], claims["sid"])
+            self._revoke_sessions([claims["sid"]])
@@ -0,0 +1,76 @@
+"""
+Lua scripts of session changes. Each one changes the session set of a user
+atomically in a single round-trip.
+KEYS[1] is the session set, its members are session ids scored by expiry
+"""
+
+_HELPERS = """
+local sessions = KEYS[1]
+
+local function is_active(session_id, now)
+    local expires_at = redis.call('ZSCORE', sessions, session_id)
+    return expires_at and tonumber(expires_at) > now
+end
+
+local function touch()
+    -- the set lives as long as its latest session
+    local last = redis.call('ZRANGE', sessions, -1, -1, 'WITHSCORES')
+    if #last > 0 then
+        redis.call('EXPIREAT', sessions, math.ceil(tonumber(last[2])))
+    end
+end
+
+local function save_session(session_id, now, ttl, max_sessions)
+    redis.call('ZREMRANGEBYSCORE', sessions, '-inf', now)
+    redis.call('ZADD', sessions, now + ttl, session_id)
+
+    -- the oldest sessions over the cap are evicted
+    local evicted = {}
+    local overflow = redis.call('ZCARD', sessions) - max_sessions
+    if overflow > 0 then
+        local popped = redis.call('ZPOPMIN', sessions, overflow)
+        for i = 1, #popped, 2 do
+            table.insert(evicted, popped[i])
+        end
+    end
+    touch()
+    return evicted
+end
+"""
+
+# ARGV: session id, now, ttl, max sessions.
+# Returns ids of the evicted sessions
+SAVE_SESSION_SCRIPT = (
+    _HELPERS
+    + """
+return save_session(ARGV[1], tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4]))
+"""
+)
+
+# ARGV: old session id, session id, now, ttl, max sessions.
+# Returns ids of the evicted sessions, nil if the old session has ended
+UPDATE_SESSION_SCRIPT = (
+    _HELPERS
+    + """
+local now = tonumber(ARGV[3])
+if not is_active(ARGV[1], now) then
+    return nil
+end
+redis.call('ZREM', sessions, ARGV[1])
+return save_session(ARGV[2], now, tonumber(ARGV[4]), tonumber(ARGV[5]))
+"""
+)
+
+# ARGV: session id, now.
+# Returns ids of every session of the user, nil if the session has ended
+CLEAR_SESSIONS_SCRIPT = (
+    _HELPERS
+    + """
+if not is_active(ARGV[1], tonumber(ARGV[2])) then
+    return nil
+end
+local ended = redis.call('ZRANGE', sessions, 0, -1)
+redis.call('DEL', sessions)
+return ended
+"""
+)
@@ -0,0 +1,148 @@
+import re
+import time
+from logging import Logger, getLogger
+from typing import Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from services.cache.cache import CacheHandler
+from services.auth_services.jwt_cache_handler import JWTCacheHandler
+
+DEFAULT_LOGGER = getLogger(__name__)
+DEFAULT_COMPACTION_BATCH_SIZE = 500
+
+SESSIONS_KEY_PATTERN = re.compile(
+    "^" + JWTCacheHandler.key_template_sessions.format(id=".+") + "$"
+)
+# token lists and session sets of each user and token pair keys of the
+# previous session layouts, nothing reads them anymore
+LEGACY_KEY_PATTERNS = (
+    re.compile(r"^user_.+_(access|refresh)_(tokens|sessions)$"),
+    re.compile(r"^eyJ[\w-]*\.[\w-]+\.[\w-]+$"),
+)
+
+# KEYS: session sets, then legacy keys. ARGV: now, number of session sets.
+# Returns pruned sessions, deleted keys, reclaimed bytes
+_COMPACT_SCRIPT = """
+local function memory_usage(key)
+    local usage = redis.pcall('MEMORY', 'USAGE', key)
+    if type(usage) == 'number' then
+        return usage
+    end
+    return 0
+end
+
+local now = ARGV[1]
+local sessions_count = tonumber(ARGV[2])
+local pruned, deleted, reclaimed = 0, 0, 0
+for i, key in ipairs(KEYS) do
+    local key_type = redis.call('TYPE', key)['ok']
+    if i <= sessions_count then
+        if key_type == 'zset' and redis.call('ZCOUNT', key, '-inf', now) > 0 then
+            local before = memory_usage(key)
+            pruned = pruned + redis.call('ZREMRANGEBYSCORE', key, '-inf', now)
+            reclaimed = reclaimed + before - memory_usage(key)
+        end
+    elseif key_type ~= 'none' then
+        reclaimed = reclaimed + memory_usage(key)
+        -- large values are freed in the background
+        redis.call('UNLINK', key)
+        deleted = deleted + 1
+    end
+end
+return {pruned, deleted, reclaimed}
+"""
+
+
+class CompactionReport(BaseModel):
+    scanned_keys: int = 0
+    pruned_sessions: int = 0
+    deleted_keys: int = 0
+    reclaimed_bytes: int = 0
+
+    def add(self, other: "CompactionReport"):
+        self.scanned_keys += other.scanned_keys
+        self.pruned_sessions += other.pruned_sessions
+        self.deleted_keys += other.deleted_keys
+        self.reclaimed_bytes += other.reclaimed_bytes
+
+
+class SessionsCompactor:
+    """
+    Walks the auth keys with SCAN and prunes what no session needs anymore:
+    expired sessions of the session sets, that are otherwise pruned only on
+    the next login of their user, and keys of the previous session layouts.
+    A batch is a SCAN step of about `batch_size` keys compacted by a single
+    script, so redis is never blocked longer than one batch and a walk can be
+    interrupted at any point. Reclaimed bytes are the MEMORY USAGE estimate
+    """
+
+    def __init__(
+        self,
+        cache: CacheHandler,
+        batch_size: int = DEFAULT_COMPACTION_BATCH_SIZE,
+        logger: Optional[Logger] = None,
+    ):
+        if not isinstance(cache, CacheHandler):
+            raise TypeError(
+                f"Variable cache should be instance of Cache and not {type(cache)}"
+            )
+        self.cache = cache
+        self.batch_size = batch_size
+        self._logger = logger or DEFAULT_LOGGER
+
+    @staticmethod
+    def _classify(keys: List[object]) -> Tuple[List[str], List[str]]:
+        sessions_keys, legacy_keys = [], []
+        for key in keys:
+            if not isinstance(key, str):
+                continue
+            if any(pattern.match(key) for pattern in LEGACY_KEY_PATTERNS):
+                legacy_keys.append(key)
+            elif SESSIONS_KEY_PATTERN.match(key):
+                sessions_keys.append(key)
+        return sessions_keys, legacy_keys
+
+    def compact_batch(self, cursor: int = 0) -> Tuple[int, CompactionReport]:
+        """
+        Compact the keys of one SCAN step
+        :return: cursor of the next step, 0 when the walk is over, and its report
+        """
+        cursor, keys = self.cache.scan(cursor, count=self.batch_size)
+        report = CompactionReport(scanned_keys=len(keys))
+        sessions_keys, legacy_keys = self._classify(keys)
+        if sessions_keys or legacy_keys:
+            pruned, deleted, reclaimed = self.cache.run_script(
+                _COMPACT_SCRIPT,
+                keys=[*sessions_keys, *legacy_keys],
+                args=[time.time(), len(sessions_keys)],
+            )
+            report.pruned_sessions = pruned
+            report.deleted_keys = deleted
+            report.reclaimed_bytes = reclaimed
+        return cursor, report
+
+    def iter_compact(self, pause: float = 0) -> Iterator[CompactionReport]:
+        """
+        Walk every key once, yield the report of each batch.
+        `pause` seconds are slept between batches to spread the load
+        """
+        cursor = 0
+        while True:
+            cursor, report = self.compact_batch(cursor)
+            yield report
+            if not cursor:
+                break
+            if pause:
+                time.sleep(pause)
+
+    def compact(self, pause: float = 0) -> CompactionReport:
+        """
+        Walk every key once
+        :return: totals of the walk
+        """
+        total = CompactionReport()
+        for report in self.iter_compact(pause):
+            total.add(report)
+        self._logger.info("SessionsCompactor: %s", total)
+        return total
@@ -0,0 +1,105 @@
+import os
+from functools import cached_property
+from typing import Any, Dict, Optional, Tuple
+
+import jwt
+from jwt.algorithms import get_default_algorithms
+
+ASYMMETRIC_ALGORITHMS = ("RS256", "EdDSA")
+PRIVATE_KEY_SUFFIX = ".pem"
+PUBLIC_KEY_SUFFIX = ".pub.pem"
+
+
+class SigningKeySet:
+    """
+    Keys of an asymmetric algorithm by key id. Tokens are signed by the
+    active key and carry its id in the `kid` header, any key of the set
+    verifies the tokens of its id and is published in the JWKS document.
+    Rotation: publish the new key, make it active once verifiers have
+    fetched it, drop the old one when the tokens it signed have expired.
+    Needs `pyjwt[crypto]`
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        private_keys: Dict[str, str],
+        public_keys: Optional[Dict[str, str]] = None,
+        active_kid: Optional[str] = None,
+    ):
+        """
+        :param private_keys: PEM private keys by key id, they sign and verify
+        :param public_keys: PEM public keys by key id, they only verify
+        :param active_kid: id of the signing key, the last one by id if not set
+        """
+        if algorithm not in ASYMMETRIC_ALGORITHMS:
+            raise ValueError(
+                f"Algorithm {algorithm} is not one of {ASYMMETRIC_ALGORITHMS}"
+            )
+        if (jwt_algorithm := get_default_algorithms().get(algorithm)) is None:
+            raise ValueError(f"Algorithm {algorithm} requires `pyjwt[crypto]`")
+        if not private_keys:
+            raise ValueError("At least one private key is required for signing")
+
+        self.algorithm = algorithm
+        self._jwt_algorithm = jwt_algorithm
+        self._private_keys = {
+            kid: jwt_algorithm.prepare_key(pem) for kid, pem in private_keys.items()
+        }
+        self._public_keys = {
+            kid: jwt_algorithm.prepare_key(pem)
+            for kid, pem in (public_keys or {}).items()
+        }
+        self._public_keys.update(
+            (kid, key.public_key()) for kid, key in self._private_keys.items()
+        )
+        self.active_kid = active_kid or max(self._private_keys)
+        if self.active_kid not in self._private_keys:
+            raise ValueError(f"No private key for the active key id {self.active_kid}")
+
+    @classmethod
+    def from_directory(
+        cls, path: str, algorithm: str, active_kid: Optional[str] = None
+    ) -> "SigningKeySet":
+        """
+        Load `<kid>.pem` private and `<kid>.pub.pem` public keys of a directory
+        """
+        private_keys, public_keys = {}, {}
+        for file_name in sorted(os.listdir(path)):
+            if file_name.endswith(PUBLIC_KEY_SUFFIX):
+                keys, kid = public_keys, file_name[: -len(PUBLIC_KEY_SUFFIX)]
+            elif file_name.endswith(PRIVATE_KEY_SUFFIX):
+                keys, kid = private_keys, file_name[: -len(PRIVATE_KEY_SUFFIX)]
+            else:
+                continue
+            with open(os.path.join(path, file_name)) as key_file:
+                keys[kid] = key_file.read()
+        return cls(algorithm, private_keys, public_keys, active_kid=active_kid)
+
+    def get_signing_key(self) -> Tuple[str, Any]:
+        return self.active_kid, self._private_keys[self.active_kid]
+
+    def get_verification_key(self, kid: Optional[str]) -> Any:
+        """
+        :exception jwt.InvalidSignatureError: if the key id is unknown
+        """
+        if (key := self._public_keys.get(kid)) is None:
+            raise jwt.InvalidSignatureError(f"Unknown key id {kid}")
+        return key
+
+    @cached_property
+    def jwks(self) -> Dict[str, Any]:
+        """
+        JWKS document of the public keys, built once
+        """
+        return {
+            "keys": [
+                {
+                    **self._jwt_algorithm.to_jwk(key, as_dict=True),
+                    "kid": kid,
+                    "alg": self.algorithm,
+                    "use": "sig",
+                }
+                for kid, key in sorted(self._public_keys.items())
+            ]
+        }
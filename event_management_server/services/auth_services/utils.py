@@ -7,16 +7,17 @@ from services.auth_services.exc import (
     TTLTokenExpiredError,
     UnknownTokenValidationError,
 )
+from services.auth_services.principal import AuthPrincipal
 from services.auth_services.security import JWTHandler
 
 
-def token_authentication(token, is_access_token: bool = True):
+def token_authentication(token, is_access_token: bool = True) -> AuthPrincipal:
     if not token:
         raise TokenRequiredError()
     
     try:
-        JWTHandler().verify_token(token, is_access_token)
-        return token
+        claims = JWTHandler().verify_token(token, is_access_token)
+        return AuthPrincipal(token=token, claims=claims, user_identifier=claims["sub"])
     except (
         IncorrectTokenTypeError,
         TTLTokenExpiredError,
@@ -0,0 +1,176 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict, defaultdict
+from logging import Logger, getLogger
+from threading import Lock
+from typing import Any, Dict, Optional, Set, Tuple
+
+from services.cache.cache import CacheHandler
+
+DEFAULT_LOGGER = getLogger(__name__)
+DEFAULT_REVOCATION_CHANNEL = "auth_revoked_tokens"
+
+
+class VerifiedTokensCache:
+    """
+    Bounded in-process LRU of verified tokens with their claims.
+    An entry lives `ttl` seconds at most and never past the token `exp`,
+    so a revocation missed by this worker takes effect within `ttl`.
+    Revocations are spread to all workers through redis pub/sub
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: float,
+        cache: Optional[CacheHandler] = None,
+        channel: str = DEFAULT_REVOCATION_CHANNEL,
+        logger: Optional[Logger] = None,
+    ):
+        if cache is not None and not isinstance(cache, CacheHandler):
+            raise TypeError(
+                f"Variable cache should be instance of Cache and not {type(cache)}"
+            )
+        self.max_size = max_size
+        self.ttl = ttl
+        self.cache = cache
+        self.channel = channel
+        self._logger = logger or DEFAULT_LOGGER
+        self._lock = Lock()
+        # token key -> (expires at, user identifier, claims)
+        self._entries = OrderedDict()
+        # session id / user identifier -> token keys, a revocation is a lookup
+        self._session_tokens: Dict[str, Set[str]] = defaultdict(set)
+        self._user_tokens: Dict[str, Set[str]] = defaultdict(set)
+        self._listener = None
+        self._listener_pid = None
+        self._listener_retry_at = 0.0
+
+    @staticmethod
+    def get_token_key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def _is_listening(self) -> bool:
+        # forked workers do not inherit the listener thread of the parent
+        return (
+            self._listener_pid == os.getpid()
+            and self._listener is not None
+            and self._listener.is_alive()
+        )
+
+    def _ensure_listener(self):
+        if (
+            self.cache is None
+            or self._is_listening()
+            or time.monotonic() < self._listener_retry_at
+        ):
+            return
+        with self._lock:
+            if self._is_listening():
+                return
+            # entries were cached without the listener, they could miss revocations
+            self._clear_entries()
+            self._listener_retry_at = time.monotonic() + self.ttl
+            try:
+                self._listener = self.cache.subscribe(
+                    self.channel,
+                    self._on_revocation,
+                    exception_handler=self._on_listener_error,
+                )
+                self._listener_pid = os.getpid()
+            except Exception:  # noqa
+                self._logger.warning(
+                    "VerifiedTokensCache: subscribe failed", exc_info=True
+                )
+
+    def _on_listener_error(self, exc: Exception):
+        # revocations may be lost until the listener is restarted
+        self._logger.warning("VerifiedTokensCache: listener failed: %s", exc)
+        self.clear()
+
+    def _on_revocation(self, message: Dict[str, Any]):
+        if "session" in message:
+            self._discard_session(message["session"])
+        elif "user" in message:
+            self._discard_user(message["user"])
+
+    def _add_entry(self, token_key: str, entry: Tuple[float, Any, Dict[str, Any]]):
+        if token_key in self._entries:
+            self._remove_entry(token_key)
+        self._entries[token_key] = entry
+        _, user_identifier, claims = entry
+        self._session_tokens[claims.get("sid")].add(token_key)
+        self._user_tokens[str(user_identifier)].add(token_key)
+
+    def _remove_entry(self, token_key: str):
+        _, user_identifier, claims = self._entries.pop(token_key)
+        for index, index_key in (
+            (self._session_tokens, claims.get("sid")),
+            (self._user_tokens, str(user_identifier)),
+        ):
+            token_keys = index.get(index_key)
+            if token_keys is not None:
+                token_keys.discard(token_key)
+                if not token_keys:
+                    del index[index_key]
+
+    def _clear_entries(self):
+        self._entries.clear()
+        self._session_tokens.clear()
+        self._user_tokens.clear()
+
+    def _discard_session(self, session_id: str):
+        with self._lock:
+            for token_key in list(self._session_tokens.get(session_id, ())):
+                self._remove_entry(token_key)
+
+    def _discard_user(self, user_identifier: Any):
+        with self._lock:
+            for token_key in list(self._user_tokens.get(str(user_identifier), ())):
+                self._remove_entry(token_key)
+
+    def _publish(self, message: Dict[str, Any]):
+        if self.cache is None:
+            return
+        try:
+            self.cache.publish(self.channel, message)
+        except Exception:  # noqa
+            self._logger.warning("VerifiedTokensCache: publish failed", exc_info=True)
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """
+        Claims of a token verified earlier or None
+        """
+        self._ensure_listener()
+        token_key = self.get_token_key(token)
+        with self._lock:
+            entry = self._entries.get(token_key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                self._remove_entry(token_key)
+                return None
+            self._entries.move_to_end(token_key)
+            return entry[2]
+
+    def put(self, token: str, user_identifier: Any, claims: Dict[str, Any]):
+        expires_at = min(time.time() + self.ttl, claims.get("exp", 0))
+        token_key = self.get_token_key(token)
+        with self._lock:
+            self._add_entry(token_key, (expires_at, user_identifier, claims))
+            while len(self._entries) > self.max_size:
+                self._remove_entry(next(iter(self._entries)))
+
+    def revoke_sessions(self, *session_ids: str):
+        for session_id in session_ids:
+            self._discard_session(session_id)
+            self._publish({"session": session_id})
+
+    def revoke_user(self, user_identifier: Any):
+        self._discard_user(user_identifier)
+        self._publish({"user": user_identifier})
+
+    def clear(self):
+        with self._lock:
+            self._clear_entries()
@@ -3,7 +3,7 @@ Cache
 """
 from collections.abc import Iterable
 from logging import Logger, getLogger
-from typing import Any, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from services.cache.cache.engine_cache import EngineCache
 from services.cache.cache.serializer_cache import CacheSerializer, StrCacheSerializer
@@ -81,6 +81,12 @@ class CacheHandler:
             return value
         return None
 
+    def get_raw(self, key: Any) -> Optional[bytes]:
+        """
+        Get value bytes as stored, not deserialized
+        """
+        return self._engine.get_raw(self._serializer.serialize_key(self._get_key(key)))
+
     def delete(self, key: Any, **kwargs) -> bool:
         """
         Delete key from cache
@@ -107,6 +113,14 @@ class CacheHandler:
     def keys(self) -> List[str]:
         return self._engine.keys()
 
+    def incr(self, key: Any, amount: int = 1) -> int:
+        """
+        Atomically increment integer value of the key
+        """
+        key = self._get_key(key)
+        serialized_key = self._serializer.serialize_key(key)
+        return self._engine.incr(serialized_key, amount)
+
     def lpush(self, key: str, value: Any):
         serialized_key, serialized_value = self._serializer.serialize(key, value)
         self._engine.lpush(serialized_key, serialized_value)
@@ -125,3 +139,105 @@ class CacheHandler:
 
     def expire(self, key: Any, ttl: int, **kwargs) -> bool:
         return self.update_ttl(key, ttl, **kwargs)
+
+    def zadd(self, key: Any, mapping: Dict[Any, float]) -> int:
+        serialized_key = self._serializer.serialize_key(self._get_key(key))
+        return self._engine.zadd(
+            serialized_key,
+            {
+                self._serializer.serialize_value(member): score
+                for member, score in mapping.items()
+            },
+        )
+
+    def zscore(self, key: Any, member: Any) -> Optional[float]:
+        serialized_key, serialized_member = self._serializer.serialize(
+            self._get_key(key), member
+        )
+        return self._engine.zscore(serialized_key, serialized_member)
+
+    def zrem(self, key: Any, *members: Any) -> int:
+        serialized_key = self._serializer.serialize_key(self._get_key(key))
+        return self._engine.zrem(
+            serialized_key,
+            *[self._serializer.serialize_value(member) for member in members],
+        )
+
+    def zrange(self, key: Any, start: int, end: int) -> List[Any]:
+        serialized_key = self._serializer.serialize_key(self._get_key(key))
+        return [
+            self._serializer.deserialize_value(member)
+            for member in self._engine.zrange(serialized_key, start, end)
+        ]
+
+    def zremrangebyscore(self, key: Any, min_score: Any, max_score: Any) -> int:
+        serialized_key = self._serializer.serialize_key(self._get_key(key))
+        return self._engine.zremrangebyscore(serialized_key, min_score, max_score)
+
+    def zcard(self, key: Any) -> int:
+        return self._engine.zcard(self._serializer.serialize_key(self._get_key(key)))
+
+    def zpopmin(self, key: Any, count: int = 1) -> List[Tuple[Any, float]]:
+        serialized_key = self._serializer.serialize_key(self._get_key(key))
+        return [
+            (self._serializer.deserialize_value(member), score)
+            for member, score in self._engine.zpopmin(serialized_key, count)
+        ]
+
+    def run_script(self, script: str, keys: List[Any], args: List[Any]) -> Any:
+        """
+        Run a server-side script with serialized keys and arguments.
+        String items of a list reply are deserialized, other replies are
+        returned as is
+        """
+        result = self._engine.run_script(
+            script,
+            keys=[self._serializer.serialize_key(self._get_key(key)) for key in keys],
+            args=[self._serializer.serialize_value(arg) for arg in args],
+        )
+        if isinstance(result, list):
+            return [
+                self._serializer.deserialize_value(item)
+                if isinstance(item, str)
+                else item
+                for item in result
+            ]
+        return result
+
+    def scan(
+        self, cursor: int = 0, match: Optional[str] = None, count: Optional[int] = None
+    ) -> Tuple[int, List[Any]]:
+        """
+        One step of an incremental walk over the keys, starts and ends at cursor 0.
+        `match` is a glob of the key before serialization, keys the serializer
+        can not read are skipped
+        """
+        cursor, serialized_keys = self._engine.scan(
+            cursor,
+            match=self._serializer.serialize_key(match) if match else None,
+            count=count,
+        )
+        keys = []
+        for serialized_key in serialized_keys:
+            try:
+                keys.append(self._serializer.deserialize_key(serialized_key))
+            except ValueError:
+                continue
+        return cursor, keys
+
+    def publish(self, channel: str, message: Any) -> int:
+        return self._engine.publish(
+            channel, self._serializer.serialize_value(message)
+        )
+
+    def subscribe(
+        self,
+        channel: str,
+        callback: Callable[[Any], None],
+        exception_handler: Optional[Callable[[Exception], None]] = None,
+    ) -> Any:
+        return self._engine.subscribe(
+            channel,
+            lambda message: callback(self._serializer.deserialize_value(message)),
+            exception_handler=exception_handler,
+        )
@@ -4,7 +4,7 @@ Module with abstract class for engines
 import warnings
 from abc import ABC, abstractmethod
 from logging import Logger
-from typing import Any, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 
 class EngineCache(ABC):
@@ -34,6 +34,13 @@ class EngineCache(ABC):
         """
         raise NotImplementedError
 
+    @abstractmethod
+    def get_raw(self, key: Any) -> Optional[bytes]:
+        """
+        Get value bytes as stored, without decoding
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def delete(self, key: Any, **kwargs) -> bool:
         """
@@ -83,6 +90,10 @@ class EngineCache(ABC):
     def keys(self) -> List[str]:
         raise NotImplementedError
 
+    @abstractmethod
+    def incr(self, key: str, amount: int = 1) -> int:
+        raise NotImplementedError
+
     @abstractmethod
     def lpush(self, key: str, value: Any):
         raise NotImplementedError
@@ -98,3 +109,64 @@ class EngineCache(ABC):
     @abstractmethod
     def lrem(self, key: str, count: int, val: Any):
         raise NotImplementedError
+
+    @abstractmethod
+    def zadd(self, key: str, mapping: Dict[Any, float]) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def zscore(self, key: str, member: Any) -> Optional[float]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def zrem(self, key: str, *members: Any) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def zrange(self, key: str, start: int, end: int) -> List[Any]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def zremrangebyscore(self, key: str, min_score: Any, max_score: Any) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def zcard(self, key: str) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def zpopmin(self, key: str, count: int = 1) -> List[Tuple[Any, float]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def run_script(self, script: str, keys: List[str], args: List[Any]) -> Any:
+        """
+        Run a server-side script atomically in a single round-trip
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def scan(
+        self, cursor: int = 0, match: Optional[str] = None, count: Optional[int] = None
+    ) -> Tuple[int, List[str]]:
+        """
+        One step of an incremental walk over the keys, starts and ends at cursor 0
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def publish(self, channel: str, message: Any) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def subscribe(
+        self,
+        channel: str,
+        callback: Callable[[Any], None],
+        exception_handler: Optional[Callable[[Exception], None]] = None,
+    ) -> Any:
+        """
+        Call `callback` with messages of the channel from a background thread.
+        Returns the listener, it has a `stop()` method
+        """
+        raise NotImplementedError
@@ -0,0 +1,98 @@
+import time
+from logging import Logger, getLogger
+from typing import Dict, Optional
+
+from pydantic import BaseModel
+
+from services.cache.cache import CacheHandler
+
+DEFAULT_LOGGER = getLogger(__name__)
+
+# KEYS: buckets. ARGV: now, then interval and burst of each bucket.
+# A bucket keeps the time its next token is due. Tokens are taken from every
+# bucket or from none, returns 0 if taken, otherwise milliseconds to wait
+_HIT_SCRIPT = """
+local now = tonumber(ARGV[1])
+local wait = 0
+local due = {}
+for i, key in ipairs(KEYS) do
+    local interval = tonumber(ARGV[i * 2])
+    local burst = tonumber(ARGV[i * 2 + 1])
+    local next_due = math.max(tonumber(redis.call('GET', key) or now), now) + interval
+    wait = math.max(wait, next_due - interval * burst - now)
+    due[i] = next_due
+end
+if wait > 0 then
+    return math.ceil(wait * 1000)
+end
+for i, key in ipairs(KEYS) do
+    redis.call('SET', key, string.format('%.3f', due[i]),
+        'PX', math.max(1, math.ceil((due[i] - now) * 1000)))
+end
+return 0
+"""
+
+
+class RateLimit(BaseModel):
+    """
+    `limit` hits per `period` seconds, all of them may come at once
+    """
+
+    limit: int
+    period: float
+
+    @classmethod
+    def parse(cls, value: str) -> Optional["RateLimit"]:
+        """
+        Parse `<limit>/<period seconds>`, a zero limit disables the rate limit
+        """
+        limit, period = value.split("/")
+        if not int(limit):
+            return None
+        return cls(limit=limit, period=period)
+
+
+class RateLimiter:
+    """
+    Token buckets kept in redis, a bucket of `limit` tokens is refilled
+    with one token every `period / limit` seconds. A hit takes a token of
+    each of its buckets atomically in a single round-trip, a bucket takes
+    one short key that expires once it is full again.
+    If redis fails hits are admitted, the limiter never denies the service
+    """
+
+    def __init__(
+        self,
+        cache: CacheHandler,
+        key_prefix: str = "rate_limit",
+        logger: Optional[Logger] = None,
+    ):
+        if not isinstance(cache, CacheHandler):
+            raise TypeError(
+                f"Variable cache should be instance of Cache and not {type(cache)}"
+            )
+        self.cache = cache
+        self.key_prefix = key_prefix
+        self._logger = logger or DEFAULT_LOGGER
+
+    def hit(self, buckets: Dict[str, RateLimit]) -> float:
+        """
+        Take a token of every bucket
+        :param buckets: rate limit by bucket name
+        :return: 0 if admitted, otherwise seconds until the hit is admitted
+        """
+        if not buckets:
+            return 0
+        args = [time.time()]
+        for rate_limit in buckets.values():
+            args.extend((rate_limit.period / rate_limit.limit, rate_limit.limit))
+        try:
+            wait_ms = self.cache.run_script(
+                _HIT_SCRIPT,
+                keys=[f"{self.key_prefix}_{name}" for name in buckets],
+                args=args,
+            )
+        except Exception:  # noqa
+            self._logger.warning("RateLimiter: hit failed", exc_info=True)
+            return 0
+        return wait_ms / 1000
@@ -0,0 +1,123 @@
+import time
+from logging import Logger, getLogger
+from threading import Lock
+from typing import Any, Callable, Dict, Optional
+
+from services.cache.cache import CacheHandler
+
+DEFAULT_LOGGER = getLogger(__name__)
+DEFAULT_STATS_INTERVAL = 10
+
+
+class ReadThroughCache:
+    """
+    Read-through cache of serialized payloads addressed by an identifier.
+    Hits and misses are counted per process and added to shared counters
+    in redis at most every `stats_interval` seconds, `stats` reads them
+    """
+
+    def __init__(
+        self,
+        cache: CacheHandler,
+        key_template: str,
+        ttl: int,
+        name: str,
+        stats_interval: float = DEFAULT_STATS_INTERVAL,
+        logger: Optional[Logger] = None,
+    ):
+        if not isinstance(cache, CacheHandler):
+            raise TypeError(
+                f"Variable cache should be instance of Cache and not {type(cache)}"
+            )
+        self.cache = cache
+        self.key_template = key_template
+        self.ttl = ttl
+        self.name = name
+        self.stats_interval = stats_interval
+        self._logger = logger or DEFAULT_LOGGER
+        self._lock = Lock()
+        # counts not yet added to the shared counters
+        self._counts = {"hits": 0, "misses": 0}
+        self._published_at = time.monotonic()
+
+    def _get_key(self, identifier: Any) -> str:
+        return self.key_template.format(id=identifier)
+
+    def _get_stats_key(self, counter: str) -> str:
+        return f"cache_stats_{self.name}_{counter}"
+
+    def _count(self, is_hit: bool):
+        with self._lock:
+            self._counts["hits" if is_hit else "misses"] += 1
+            now = time.monotonic()
+            if now - self._published_at < self.stats_interval:
+                return
+            self._published_at = now
+            counts = self._counts
+            self._counts = {"hits": 0, "misses": 0}
+        self._publish_stats(counts)
+
+    def _publish_stats(self, counts: Dict[str, int]):
+        for counter, count in counts.items():
+            if not count:
+                continue
+            try:
+                self.cache.incr(self._get_stats_key(counter), count)
+            except Exception:  # noqa
+                self._logger.warning(
+                    "ReadThroughCache: publish %s stats failed",
+                    self.name,
+                    exc_info=True,
+                )
+                # kept for the next publish
+                with self._lock:
+                    self._counts[counter] += count
+
+    def get_or_load(self, identifier: Any, loader: Callable[[], Any]) -> Any:
+        """
+        Return cached payload or build it with `loader` and store it.
+        Cache failures are logged and the payload is served from `loader`.
+        """
+        key = payload = None
+        try:
+            key = self._get_key(identifier)
+            payload = self.cache.get(key)
+        except Exception:  # noqa
+            self._logger.warning(
+                "ReadThroughCache: get %s failed", identifier, exc_info=True
+            )
+
+        if payload is not None:
+            self._count(is_hit=True)
+            return payload
+
+        self._count(is_hit=False)
+        payload = loader()
+        if key is None:
+            return payload
+        try:
+            self.cache.set(key, payload, ttl=self.ttl)
+        except Exception:  # noqa
+            self._logger.warning("ReadThroughCache: set %s failed", key, exc_info=True)
+        return payload
+
+    def invalidate(self, identifier: Any):
+        try:
+            self.cache.delete(self._get_key(identifier))
+        except Exception:  # noqa
+            self._logger.warning(
+                "ReadThroughCache: delete %s failed", identifier, exc_info=True
+            )
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Hits and misses of every process, up to `stats_interval` behind
+        """
+        return {
+            counter: int(self.cache.get(self._get_stats_key(counter)) or 0)
+            for counter in ("hits", "misses")
+        }
+
+    def reset_stats(self):
+        for counter in ("hits", "misses"):
+            self.cache.delete(self._get_stats_key(counter))
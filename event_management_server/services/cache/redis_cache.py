@@ -1,7 +1,8 @@
 from logging import Logger, getLogger
-from typing import Any, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import redis
+from redis.client import NEVER_DECODE
 from pydantic import BaseModel
 
 from .cache import EngineCache
@@ -45,6 +46,7 @@ class RedisCacheEngine(EngineCache):
         self._set_logger(logger)
 
         self._config = config
+        self._scripts = {}
         self._connect()
 
     def __del__(self):
@@ -90,6 +92,9 @@ class RedisCacheEngine(EngineCache):
             raise exc
         return resp
 
+    def get_raw(self, key: str) -> Optional[bytes]:
+        return self.connect.execute_command("GET", key, **{NEVER_DECODE: True})
+
     def delete(self, key: str, **kwargs) -> bool:
         return bool(self.connect.delete(key))
 
@@ -102,6 +107,9 @@ class RedisCacheEngine(EngineCache):
     def keys(self) -> List[str]:
         return self.connect.keys()
 
+    def incr(self, key: str, amount: int = 1) -> int:
+        return self.connect.incr(key, amount)
+
     def lpush(self, key: str, value: Any):
         self.connect.lpush(key, value)
 
@@ -113,3 +121,57 @@ class RedisCacheEngine(EngineCache):
 
     def lrem(self, key: str, count: int, val: Any):
         self.connect.lrem(name=key, count=count, value=val)
+
+    def zadd(self, key: str, mapping: Dict[Any, float]) -> int:
+        return self.connect.zadd(key, mapping)
+
+    def zscore(self, key: str, member: Any) -> Optional[float]:
+        return self.connect.zscore(key, member)
+
+    def zrem(self, key: str, *members: Any) -> int:
+        return self.connect.zrem(key, *members)
+
+    def zrange(self, key: str, start: int, end: int) -> List[Any]:
+        return self.connect.zrange(key, start, end)
+
+    def zremrangebyscore(self, key: str, min_score: Any, max_score: Any) -> int:
+        return self.connect.zremrangebyscore(key, min_score, max_score)
+
+    def zcard(self, key: str) -> int:
+        return self.connect.zcard(key)
+
+    def zpopmin(self, key: str, count: int = 1) -> List[Tuple[Any, float]]:
+        return self.connect.zpopmin(key, count)
+
+    def run_script(self, script: str, keys: List[str], args: List[Any]) -> Any:
+        # registered scripts are called by sha and reloaded when redis lost them
+        if (registered := self._scripts.get(script)) is None:
+            registered = self._scripts[script] = self.connect.register_script(script)
+        return registered(keys=keys, args=args)
+
+    def scan(
+        self, cursor: int = 0, match: Optional[str] = None, count: Optional[int] = None
+    ) -> Tuple[int, List[str]]:
+        return self.connect.scan(cursor=cursor, match=match, count=count)
+
+    def publish(self, channel: str, message: Any) -> int:
+        return self.connect.publish(channel, message)
+
+    def subscribe(
+        self,
+        channel: str,
+        callback: Callable[[Any], None],
+        exception_handler: Optional[Callable[[Exception], None]] = None,
+    ) -> Any:
+        pubsub = self.connect.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{channel: lambda message: callback(message["data"])})
+
+        def handle_exception(exc, pubsub, thread):
+            thread.stop()
+            pubsub.close()
+            if exception_handler:
+                exception_handler(exc)
+
+        return pubsub.run_in_thread(
+            sleep_time=1, daemon=True, exception_handler=handle_exception
+        )
@@ -0,0 +1,41 @@
+import hashlib
+import json
+from typing import Any, Dict
+
+from services.cache.read_through_cache import ReadThroughCache
+
+
+class VersionedQueryCache(ReadThroughCache):
+    """
+    Read-through cache of query results keyed by a hash of normalized
+    query parameters under a namespace version.
+    Bumping the version makes every stored result unreachable in O(1),
+    orphaned entries are dropped by their TTL.
+    """
+
+    def __init__(self, *args, namespace: str, **kwargs):
+        kwargs.setdefault("key_template", f"{namespace}_v{{version}}_{{digest}}")
+        kwargs.setdefault("name", namespace)
+        super().__init__(*args, **kwargs)
+        self.namespace = namespace
+        self.version_key = f"{namespace}_version"
+
+    def get_version(self) -> int:
+        return int(self.cache.get(self.version_key) or 0)
+
+    def _get_key(self, identifier: Dict[str, Any]) -> str:
+        normalized = json.dumps(
+            identifier, sort_keys=True, separators=(",", ":"), default=str
+        )
+        return self.key_template.format(
+            version=self.get_version(),
+            digest=hashlib.sha256(normalized.encode()).hexdigest(),
+        )
+
+    def bump_version(self):
+        try:
+            self.cache.incr(self.version_key)
+        except Exception:  # noqa
+            self._logger.warning(
+                "VersionedQueryCache: bump %s failed", self.version_key, exc_info=True
+            )
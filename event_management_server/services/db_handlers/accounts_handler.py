@@ -1,13 +1,14 @@
-from typing import Optional, Tuple
+from typing import Any, Dict, Optional, Tuple
 
 from api.api_core.schemas.accounts_schemas import AuthSchema
+from asgiref.sync import sync_to_async
 from django.contrib.auth import get_user_model
 from django.http import HttpRequest
 from api.api_core.utils.exceptions import UserEmailNotFoundError, WrongPasswordError
 from api.api_core.schemas.accounts_schemas import AccountResponseSchema
 from services.auth_services.auth_checker import HeaderAccessKey, HeaderRefreshKey
-from settings import JWT_HANDLER
-from api.api_core.utils.exceptions import UserDoesNotExistError
+from services.auth_services.principal import AuthPrincipal
+from settings import JWT_HANDLER, PASSWORD_HASHING_POOL
 
 User = get_user_model()
 
@@ -31,27 +32,59 @@ class AccountsHandler:
         return headers
 
     @staticmethod
-    def user_login(
+    def refresh_jwt_headers(principal: AuthPrincipal) -> dict:
+        """
+        New pair for the session of a verified refresh token. Claims are
+        rebuilt from the token subject, the database is not touched
+        """
+        headers = dict()
+        access_token, refresh_token = JWT_HANDLER.update_token_pairs(
+            old_token=principal.token,
+            is_access_token=False,
+            claims=principal.claims,
+        )
+        headers[HeaderAccessKey.param_name] = access_token
+        headers[HeaderRefreshKey.param_name] = refresh_token
+        return headers
+
+    @staticmethod
+    def user_logout(principal: AuthPrincipal):
+        JWT_HANDLER.logout_user(principal.token)
+
+    @staticmethod
+    def user_logout_everywhere(principal: AuthPrincipal):
+        JWT_HANDLER.logout_everywhere(principal.token)
+
+    @staticmethod
+    def get_jwks() -> Dict[str, Any]:
+        return JWT_HANDLER.get_jwks()
+
+    @staticmethod
+    async def user_login(
         data: AuthSchema, request: HttpRequest
-    ) -> Tuple[dict, User]: 
-        if not AccountsHandler.check_user(data.email):
+    ) -> Tuple[dict, User]:
+        user = await User.objects.filter(email=data.email).afirst()
+        if user is None:
             raise UserEmailNotFoundError()
-        user = User.objects.get(email=data.email)
 
-        if not user.check_password(data.password.get_secret_value()):
+        password = data.password.get_secret_value()
+        is_correct, must_update = await PASSWORD_HASHING_POOL.verify_password(
+            password, user.password
+        )
+        if not is_correct:
             raise WrongPasswordError()
+        if must_update:
+            # the hash of an old algorithm or work factor is upgraded on login
+            user.password = await PASSWORD_HASHING_POOL.make_password(password)
+            await user.asave(update_fields=["password"])
 
         user_model = user.to_pydantic()
-        headers = AccountsHandler.generate_jwt_headers(user_model)
-        result = User.objects.filter(email=user.email)
-        return headers, result.first()
-    
+        headers = await sync_to_async(
+            AccountsHandler.generate_jwt_headers, thread_sensitive=False
+        )(user_model)
+        return headers, user
+
     @staticmethod
     def get_user_by_id(request: HttpRequest) -> User:
-        user_id = JWT_HANDLER.get_user_identifier(token=request.auth)
-        users = User.objects.filter(id=user_id)
-        if users.exists():
-            user = users.first()
-            return user
-            
-        raise UserDoesNotExistError()
+        # the principal loads the user once per request
+        return request.auth.user
@@ -1,19 +1,95 @@
-from apps.events.models import Event, EventRegistration, EventRegistrationStatus
-from django.db.models import Q
+from apps.events.models import EVENT_SEARCH_CONFIG, REGISTRATION_COUNTER_FIELDS, SEAT_HOLDING_STATUSES, CheckInResult, CheckInScan, Event, EventStatus, EventRegistration, EventRegistrationStatus
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection, transaction
+from django.db.models import Count, F, FloatField, Max, Q
+from django.db.models.functions import Cast
 from datetime import datetime, timedelta
-from api.api_core.utils.exceptions import EventDoesNotExistError, CannotUpdateOtherEvent, RegistrationNotFoundError
-from api.api_core.schemas.event_schemas import EventSchema
+from django.utils import timezone
+import json
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from api.api_core.utils.conditional import make_etag
+from api.api_core.utils.exceptions import AlreadyRegisteredError, EventDoesNotExistError, CannotCheckInAttendees, CannotDeleteOtherEvent, ConflictingScanError, CannotRegisterOtherUsers, CannotUpdateOtherEvent, RegistrationNotFoundError, InvalidCursorError
+from api.api_core.utils.pagination import decode_cursor, encode_cursor
+from api.api_core.schemas.event_schemas import BulkRegistrationOutcomeEnum, BulkRegistrationResultSchema, BulkRegistrationSchema, CheckInBatchSchema, CheckInResultEnum, CheckInScanResultSchema, EventListItemSchema, EventRegistrationSchema, EventSchema, EventsPageSchema, EventStatusEnum, EventSummarySchema, RegistrationPeriodEnum, RegistrationStatusEnum, UserRegistrationSchema, UserRegistrationsPageSchema
 from apps.accounts.models import User
+from data_models.events_models import EVENT_DATE_FORMAT
+from services.db_handlers.registrations_sql import CANCEL_SQL, CHECK_IN_SQL, NOT_ATTENDED_SQL, REGISTER_SQL
+from settings import EVENT_DETAIL_CACHE, EVENTS_LIST_CACHE
+
+EVENT_EDITABLE_FIELDS = (
+    "title",
+    "description",
+    "date",
+    "location",
+    "status",
+    "duration",
+    "max_capacity",
+    "is_draft",
+    "ends_at",
+    "updated_at",
+)
+
+EVENT_LIST_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "date",
+    "location",
+    "status",
+    "duration",
+    "max_capacity",
+    "is_draft",
+    "seats_taken",
+    "pending_count",
+)
+
+USER_REGISTRATION_FIELDS = (
+    "id",
+    "status",
+    "registered_at",
+    "cancelled_at",
+    "event_id",
+    "event__title",
+    "event__date",
+    "event__location",
+    "event__status",
+    "event__organizer__first_name",
+    "event__organizer__last_name",
+)
+
+BULK_REGISTRATION_BATCH_SIZE = 500
 
 class EventsHandler:
     @staticmethod
     def get_event_obj(event_id: int) -> Event:
         try:
-            event = Event.objects.get(id=event_id)
-        except:
+            event = Event.objects.select_related("organizer").get(id=event_id)
+        except Event.DoesNotExist:
             raise EventDoesNotExistError()
         return event
-    
+
+    @staticmethod
+    def get_event_info(event_id: int) -> dict:
+        """
+        Serialized EventDataModel of the event, served through the cache
+        """
+        return EVENT_DETAIL_CACHE.get_or_load(
+            event_id,
+            lambda: EventsHandler.get_event_obj(event_id)
+            .to_pydantic()
+            .model_dump(mode="json"),
+        )
+
+    @staticmethod
+    def invalidate_event_caches(event_id: int):
+        # dropping entries before commit would let a reader re-cache the old row
+        def invalidate():
+            EVENT_DETAIL_CACHE.invalidate(event_id)
+            EVENTS_LIST_CACHE.bump_version()
+
+        transaction.on_commit(invalidate)
+
     @staticmethod
     def create_event(user, payload: EventSchema):
         event = Event.objects.create(
@@ -27,92 +103,798 @@ class EventsHandler:
             is_draft=payload.is_draft,
             organizer=user,
         )
-        
+        EventsHandler.invalidate_event_caches(event.id)
+
         return event
 
     @staticmethod
     def update_event(event_id: int, user: User, payload: EventSchema) -> Event:
+        with transaction.atomic():
+            event = EventsHandler._lock_event(event_id)
+            if event.organizer_id != user.id:
+                raise CannotUpdateOtherEvent()
+
+            event.title = payload.title
+            event.description = payload.description
+            event.date = datetime.fromisoformat(payload.date)
+            event.location = payload.location
+            event.status = payload.status.value
+            event.duration = timedelta(minutes=payload.duration) if payload.duration else None
+            event.max_capacity = payload.max_capacity
+            event.is_draft = payload.is_draft
+
+            # counters are maintained by registrations and must not be overwritten
+            event.save(update_fields=EVENT_EDITABLE_FIELDS)
+            promoted = EventsHandler._promote_waitlist(event)
+            EventsHandler._update_counters(
+                event,
+                {
+                    EventRegistrationStatus.PENDING: -promoted,
+                    EventRegistrationStatus.REGISTERED: promoted,
+                },
+            )
+            EventsHandler.invalidate_event_caches(event.id)
+
+        return event
+
+    @staticmethod
+    def delete_event(event_id: int, user: User):
         event = EventsHandler.get_event_obj(event_id)
-        if event.organizer != user:
-            raise CannotUpdateOtherEvent() 
-        
-        event.title = payload.title
-        event.description = payload.description
-        event.date = datetime.fromisoformat(payload.date)
-        event.location = payload.location
-        event.status = payload.status.value
-        event.duration = timedelta(minutes=payload.duration) if payload.duration else None
-        event.max_capacity = payload.max_capacity
-        event.is_draft = payload.is_draft
+        if event.organizer_id != user.id:
+            raise CannotDeleteOtherEvent()
 
-        event.save()
+        event.delete()
+        EventsHandler.invalidate_event_caches(event_id)
 
+    @staticmethod
+    def _event_row_to_item(row: dict) -> dict:
+        duration = row["duration"]
+        return {
+            "title": row["title"],
+            "description": row["description"],
+            "date": row["date"].strftime(EVENT_DATE_FORMAT),
+            "location": row["location"],
+            "status": row["status"],
+            "duration": int(duration.total_seconds() // 60) if duration else None,
+            "max_capacity": row["max_capacity"],
+            "is_draft": row["is_draft"],
+            "id": row["id"],
+            "seats_taken": row["seats_taken"],
+            "pending_count": row["pending_count"],
+        }
 
     @staticmethod
-    def get_events_list(request, filters_query) -> list[Event]:
-        filters = Q()
-        
+    def _item_to_schema(item: dict) -> EventListItemSchema:
+        # items are built from database rows, so validation is skipped
+        return EventListItemSchema.model_construct(
+            **{**item, "status": EventStatusEnum(item["status"])}
+        )
+
+    @staticmethod
+    def _normalize_filters(filters_query) -> dict:
+        """
+        Bring list filters to a canonical form, equal filter sets give equal dicts
+        """
+        status_list = []
         if filters_query.statuses:
-            status_list = [s.strip() for s in filters_query.statuses.split(",") if s.strip()]
-            if status_list:
-                filters &= Q(status__in=status_list)
+            status_list = sorted(
+                {s.strip() for s in filters_query.statuses.split(",") if s.strip()}
+            )
 
-        if filters_query.organizer_id:
-            filters &= Q(organizer_id=filters_query.organizer_id)
+        dates = {}
+        for name in ("date_from", "date_to"):
+            value = getattr(filters_query, name)
+            dates[name] = None
+            if value:
+                try:
+                    dates[name] = datetime.fromisoformat(value).isoformat()
+                except ValueError:
+                    # ignore bad date or optionally raise 400
+                    pass
 
-        if filters_query.date_from:
-            try:
-                date_from = datetime.fromisoformat(filters_query.date_from)
-                filters &= Q(date__gte=date_from)
-            except Exception:
-                # ignore bad date or optionally raise 400
-                pass
+        return {
+            "statuses": status_list,
+            "organizer_id": filters_query.organizer_id or None,
+            "date_from": dates["date_from"],
+            "date_to": dates["date_to"],
+            "q": (filters_query.q or "").strip() or None,
+            "after": decode_cursor(filters_query.after) if filters_query.after else None,
+            "limit": filters_query.limit,
+        }
 
-        if filters_query.date_to:
-            try:
-                date_to = datetime.fromisoformat(filters_query.date_to)
-                filters &= Q(date__lte=date_to)
-            except Exception:
-                pass
-        
-        qs = Event.objects.filter(filters).order_by("id")
-        events_list = []
-        
-        for event in qs:
-            pd = event.to_pydantic()
-            if hasattr(pd, "dict"):
-                event_dict = pd.dict()
+    @staticmethod
+    def _filter_events(params: dict):
+        """
+        Events matching the normalized filters, annotated with `rank` for searches
+        """
+        filters = Q()
+
+        if params["statuses"]:
+            filters &= Q(status__in=params["statuses"])
+
+        if params["organizer_id"]:
+            filters &= Q(organizer_id=params["organizer_id"])
+
+        if params["date_from"]:
+            filters &= Q(date__gte=datetime.fromisoformat(params["date_from"]))
+
+        if params["date_to"]:
+            filters &= Q(date__lte=datetime.fromisoformat(params["date_to"]))
+
+        qs = Event.objects.filter(filters)
+        if params["q"]:
+            search_query = SearchQuery(
+                params["q"], search_type="websearch", config=EVENT_SEARCH_CONFIG
+            )
+            # the GIN index narrows the table to matches, only they get ranked.
+            # ts_rank is a float4, as float8 the cursor rank compares exactly
+            qs = qs.filter(search_vector=search_query).annotate(
+                rank=Cast(SearchRank(F("search_vector"), search_query), FloatField())
+            )
+        return qs
+
+    @staticmethod
+    def _load_events_page(params: dict) -> dict:
+        qs = EventsHandler._filter_events(params)
+        search_text = params["q"]
+        ordering = ("-rank", "id") if search_text else ("id",)
+
+        if params["after"]:
+            position = params["after"]
+            last_id = position.get("id")
+            if not isinstance(last_id, int):
+                raise InvalidCursorError()
+            if search_text:
+                last_rank = position.get("rank")
+                if not isinstance(last_rank, (int, float)):
+                    raise InvalidCursorError()
+                qs = qs.filter(
+                    Q(rank__lt=last_rank) | Q(rank=last_rank, id__gt=last_id)
+                )
             else:
-                event_dict = dict(pd)
-            
-            if isinstance(event_dict.get("date"), (datetime,)):
-                event_dict["date"] = event_dict["date"].isoformat()
-            if event_dict.get("created_at") and isinstance(event_dict["created_at"], datetime):
-                event_dict["created_at"] = event_dict["created_at"].isoformat()
-            if event_dict.get("updated_at") and isinstance(event_dict["updated_at"], datetime):
-                event_dict["updated_at"] = event_dict["updated_at"].isoformat()
-
-            event_schema = EventSchema(**event_dict)
-            events_list.append(event_schema)
-
-        return events_list
-    
-    @staticmethod
-    def register_user(user, event_id: int) -> Event:
-        event = EventsHandler.get_event_obj(event_id)
-        EventRegistration.objects.create(user=user, event=event)
-        return event.to_pydantic()
-    
+                qs = qs.filter(id__gt=last_id)
+
+        limit = params["limit"]
+        fields = EVENT_LIST_FIELDS + (("rank",) if search_text else ())
+        # one extra row tells whether there is a next page without a COUNT(*)
+        rows = list(qs.order_by(*ordering).values(*fields)[: limit + 1])
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            position = {"id": rows[-1]["id"]}
+            if search_text:
+                position["rank"] = rows[-1]["rank"]
+            next_cursor = encode_cursor(position)
+
+        return {
+            "items": [EventsHandler._event_row_to_item(row) for row in rows],
+            "next_cursor": next_cursor,
+        }
+
     @staticmethod
-    def cancel_registration(user, event_id: int) -> Event:
-        event = EventsHandler.get_event_obj(event_id)
-        events = EventRegistration.objects.filter(user=user, event=event)
-        if events.exists():
-            event_registration_obj = events.first()
-            event_registration_obj.status = EventRegistrationStatus.CANCELLED
-            event_registration_obj.cancelled_at = datetime.now()
-            event_registration_obj.save()
-        else:
-            raise RegistrationNotFoundError()
-        
-        return event.to_pydantic()
\ No newline at end of file
+    def _load_events_validators(params: dict) -> dict:
+        aggregate = (
+            EventsHandler._filter_events(params)
+            .order_by()
+            .aggregate(updated_at=Max("updated_at"), count=Count("id"))
+        )
+        updated_at = aggregate["updated_at"]
+        return {
+            "updated_at": updated_at.isoformat() if updated_at else None,
+            "count": aggregate["count"],
+        }
+
+    @staticmethod
+    def get_events_list_etag(filters_query, page: dict) -> str:
+        """
+        ETag of the list, derived from an aggregate over the filtered events
+        and the live counters of the page. There is no Last-Modified, the
+        latest update time does not change when an event is deleted, leaves
+        the filter or fills up
+        """
+        params = EventsHandler._normalize_filters(filters_query)
+        validators = EVENTS_LIST_CACHE.get_or_load(
+            {**params, "validators": True},
+            lambda: EventsHandler._load_events_validators(params),
+        )
+        return make_etag(
+            json.dumps(params, sort_keys=True),
+            validators["updated_at"],
+            validators["count"],
+            [
+                (item["id"], item["seats_taken"], item["pending_count"])
+                for item in page["items"]
+            ],
+        )
+
+    @staticmethod
+    def _overlay_live_counters(items: List[dict]) -> List[dict]:
+        """
+        Registrations do not bump the list cache version, so counters of
+        cached items are replaced by the current ones in a single query.
+        Items of events deleted in the meantime are left out
+        """
+        counters = {
+            event_id: (seats_taken, pending_count)
+            for event_id, seats_taken, pending_count in Event.objects.filter(
+                id__in=[item["id"] for item in items]
+            ).values_list("id", "seats_taken", "pending_count")
+        }
+        return [
+            {
+                **item,
+                "seats_taken": counters[item["id"]][0],
+                "pending_count": counters[item["id"]][1],
+            }
+            for item in items
+            if item["id"] in counters
+        ]
+
+    @staticmethod
+    def get_events_list(request, filters_query) -> dict:
+        """
+        Page of the list served through the cache, with live counters.
+        Turned into the response schema by `events_page_to_schema` only when
+        the body is sent
+        """
+        params = EventsHandler._normalize_filters(filters_query)
+        page = EVENTS_LIST_CACHE.get_or_load(
+            params, lambda: EventsHandler._load_events_page(params)
+        )
+        items = page["items"]
+        if items:
+            items = EventsHandler._overlay_live_counters(items)
+        return {"items": items, "next_cursor": page["next_cursor"]}
+
+    @staticmethod
+    def events_page_to_schema(page: dict) -> EventsPageSchema:
+        return EventsPageSchema.model_construct(
+            items=[EventsHandler._item_to_schema(item) for item in page["items"]],
+            next_cursor=page["next_cursor"],
+        )
+
+    @staticmethod
+    def _lock_event(event_id: int) -> Event:
+        """
+        Registration state changes of an event are serialized on its row lock
+        """
+        event = (
+            Event.objects.select_for_update(of=("self",))
+            .select_related("organizer")
+            .filter(id=event_id)
+            .first()
+        )
+        if event is None:
+            raise EventDoesNotExistError()
+        return event
+
+    @staticmethod
+    def _get_free_seats(event: Event, released_seats: int = 0) -> Optional[int]:
+        if event.max_capacity is None:
+            return None
+        return max(event.max_capacity - event.seats_taken + released_seats, 0)
+
+    @staticmethod
+    def _update_counters(event: Event, changes: Dict[str, int]):
+        """
+        Apply registration status deltas, e.g. {PENDING: -1, REGISTERED: 1},
+        to the counters of the locked event in a single UPDATE
+        """
+        updates = {}
+        for status, delta in changes.items():
+            field = REGISTRATION_COUNTER_FIELDS.get(status)
+            if field and delta:
+                setattr(event, field, getattr(event, field) + delta)
+                updates[field] = F(field) + delta
+        seats_delta = sum(changes.get(status, 0) for status in SEAT_HOLDING_STATUSES)
+        if seats_delta:
+            event.seats_taken += seats_delta
+            updates["seats_taken"] = F("seats_taken") + seats_delta
+        if updates:
+            Event.objects.filter(id=event.id).update(**updates)
+
+    @staticmethod
+    def reconcile_counters(after_id: int, batch_size: int) -> Tuple[Optional[int], int]:
+        """
+        Recount registration counters of the next `batch_size` events after
+        `after_id` and repair drifted ones. Rows of the batch are locked,
+        so the counts cannot race with registrations.
+        Returns the last processed event id (None when done) and repaired count
+        """
+        counter_fields = ("seats_taken", *REGISTRATION_COUNTER_FIELDS.values())
+        with transaction.atomic():
+            events = list(
+                Event.objects.select_for_update()
+                .filter(id__gt=after_id)
+                .order_by("id")
+                .values("id", *counter_fields)[:batch_size]
+            )
+            if not events:
+                return None, 0
+
+            event_ids = [event["id"] for event in events]
+            expected = {
+                event_id: dict.fromkeys(counter_fields, 0) for event_id in event_ids
+            }
+            rows = (
+                EventRegistration.objects.filter(
+                    event_id__in=event_ids, status__in=REGISTRATION_COUNTER_FIELDS
+                )
+                .order_by()
+                .values("event_id", "status")
+                .annotate(total=Count("id"))
+            )
+            for row in rows:
+                counters = expected[row["event_id"]]
+                counters[REGISTRATION_COUNTER_FIELDS[row["status"]]] = row["total"]
+                if row["status"] in SEAT_HOLDING_STATUSES:
+                    counters["seats_taken"] += row["total"]
+
+            repaired = 0
+            for event in events:
+                counters = expected[event["id"]]
+                if any(event[field] != counters[field] for field in counter_fields):
+                    Event.objects.filter(id=event["id"]).update(**counters)
+                    repaired += 1
+            if repaired:
+                transaction.on_commit(EVENTS_LIST_CACHE.bump_version)
+
+        return event_ids[-1], repaired
+
+    @staticmethod
+    def _promote_waitlist(event: Event, released_seats: int = 0) -> int:
+        """
+        Move heads of the waitlist into free seats of the locked event,
+        `released_seats` are freed by the caller but not yet counted.
+        Heads are read from the partial waitlist index, queue length does not matter
+        """
+        free_seats = EventsHandler._get_free_seats(event, released_seats)
+        if free_seats == 0:
+            return 0
+        head_ids = list(
+            EventRegistration.objects.filter(
+                event_id=event.id, status=EventRegistrationStatus.PENDING
+            )
+            .order_by("waitlisted_at", "id")
+            .values_list("id", flat=True)[:free_seats]
+        )
+        if head_ids:
+            EventRegistration.objects.filter(id__in=head_ids).update(
+                status=EventRegistrationStatus.REGISTERED, waitlisted_at=None
+            )
+        return len(head_ids)
+
+    @staticmethod
+    def _registration_to_schema(
+        registration: EventRegistration, waitlist_position: Optional[int] = None
+    ) -> EventRegistrationSchema:
+        return EventRegistrationSchema(
+            event_id=registration.event_id,
+            status=registration.status,
+            registered_at=registration.registered_at,
+            waitlist_position=waitlist_position,
+        )
+
+    @staticmethod
+    def register_user(user, event_id: int) -> EventRegistrationSchema:
+        """
+        Register the user or take over their cancelled registration,
+        the row and event counters are written by one statement.
+        A waitlisted registration joins the tail, its position is the waitlist
+        length counted under the event lock
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            event = EventsHandler._lock_event(event_id)
+            has_seat = EventsHandler._get_free_seats(event) != 0
+            status = (
+                EventRegistrationStatus.REGISTERED
+                if has_seat
+                else EventRegistrationStatus.PENDING
+            )
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    REGISTER_SQL[status],
+                    {
+                        "event_id": event_id,
+                        "user_id": user.id,
+                        "now": now,
+                        "waitlisted_at": None if has_seat else now,
+                    },
+                )
+                row = cursor.fetchone()
+            if row is None:
+                raise AlreadyRegisteredError()
+
+        registration_id, registered_at = row
+        return EventsHandler._registration_to_schema(
+            EventRegistration(
+                id=registration_id,
+                event_id=event_id,
+                user=user,
+                status=status,
+                registered_at=registered_at,
+                waitlisted_at=None if has_seat else now,
+            ),
+            waitlist_position=None if has_seat else event.pending_count + 1,
+        )
+
+    @staticmethod
+    def cancel_registration(user, event_id: int) -> EventRegistrationSchema:
+        """
+        Cancel the registration, a released seat goes to the head of the
+        waitlist. The rows and event counters are written by one statement
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            event = EventsHandler._lock_event(event_id)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    CANCEL_SQL,
+                    {
+                        "event_id": event_id,
+                        "user_id": user.id,
+                        "now": now,
+                        "free_seats": EventsHandler._get_free_seats(
+                            event, released_seats=1
+                        ),
+                    },
+                )
+                row = cursor.fetchone()
+            if row is None:
+                raise RegistrationNotFoundError()
+
+        registration_id, registered_at, _ = row
+        return EventsHandler._registration_to_schema(
+            EventRegistration(
+                id=registration_id,
+                event_id=event_id,
+                user=user,
+                status=EventRegistrationStatus.CANCELLED,
+                registered_at=registered_at,
+                cancelled_at=now,
+            )
+        )
+
+    @staticmethod
+    def bulk_register_users(
+        user: User, event_id: int, payload: BulkRegistrationSchema
+    ) -> List[BulkRegistrationResultSchema]:
+        """
+        Register users given by ID or email, seats are taken in request order
+        and the rest is waitlisted. Returns an outcome per requested entry
+        """
+        # emails are stored with the domain lowercased, results keep the requested form
+        normalized_emails = {
+            email: User.objects.normalize_email(email) for email in payload.emails
+        }
+        found_users = {}
+        if payload.user_ids or payload.emails:
+            found_users = dict(
+                User.objects.filter(
+                    Q(id__in=payload.user_ids)
+                    | Q(email__in=set(normalized_emails.values()))
+                ).values_list("id", "email")
+            )
+        id_by_email = {email: user_id for user_id, email in found_users.items()}
+        requested = [
+            (user_id, None, user_id if user_id in found_users else None)
+            for user_id in payload.user_ids
+        ] + [
+            (None, email, id_by_email.get(normalized_emails[email]))
+            for email in payload.emails
+        ]
+        user_ids = list(
+            dict.fromkeys(user_id for _, _, user_id in requested if user_id is not None)
+        )
+
+        with transaction.atomic():
+            event = EventsHandler._lock_event(event_id)
+            if event.organizer_id != user.id and not user.is_staff:
+                raise CannotRegisterOtherUsers()
+
+            existing = dict(
+                EventRegistration.objects.filter(
+                    event_id=event_id, user_id__in=user_ids
+                ).values_list("user_id", "status")
+            )
+            # cancelled registrations are taken over like new ones
+            new_ids = [
+                user_id
+                for user_id in user_ids
+                if existing.get(user_id, EventRegistrationStatus.CANCELLED)
+                == EventRegistrationStatus.CANCELLED
+            ]
+            free_seats = EventsHandler._get_free_seats(event)
+            seated = len(new_ids) if free_seats is None else min(free_seats, len(new_ids))
+            now = timezone.now()
+            statuses = {
+                user_id: EventRegistrationStatus.REGISTERED
+                if position < seated
+                else EventRegistrationStatus.PENDING
+                for position, user_id in enumerate(new_ids)
+            }
+            EventRegistration.objects.bulk_create(
+                [
+                    EventRegistration(
+                        event_id=event_id,
+                        user_id=user_id,
+                        status=status,
+                        waitlisted_at=(
+                            now if status == EventRegistrationStatus.PENDING else None
+                        ),
+                    )
+                    for user_id, status in statuses.items()
+                    if user_id not in existing
+                ],
+                batch_size=BULK_REGISTRATION_BATCH_SIZE,
+                ignore_conflicts=True,
+            )
+            for status in (
+                EventRegistrationStatus.REGISTERED,
+                EventRegistrationStatus.PENDING,
+            ):
+                taken_over = [
+                    user_id
+                    for user_id, new_status in statuses.items()
+                    if new_status == status and user_id in existing
+                ]
+                if taken_over:
+                    EventRegistration.objects.filter(
+                        event_id=event_id, user_id__in=taken_over
+                    ).update(
+                        status=status,
+                        registered_at=now,
+                        cancelled_at=None,
+                        waitlisted_at=(
+                            now if status == EventRegistrationStatus.PENDING else None
+                        ),
+                    )
+            # skipped conflicts are not reported by the insert, stored rows are
+            created = dict(
+                EventRegistration.objects.filter(
+                    event_id=event_id, user_id__in=new_ids
+                ).values_list("user_id", "status")
+            )
+            EventsHandler._update_counters(event, Counter(created.values()))
+
+        outcomes = {
+            user_id: BulkRegistrationOutcomeEnum(created[user_id])
+            if user_id in created
+            else BulkRegistrationOutcomeEnum.ALREADY_REGISTERED
+            for user_id in user_ids
+        }
+        return [
+            BulkRegistrationResultSchema(
+                user_id=requested_id,
+                email=email,
+                outcome=(
+                    outcomes[user_id]
+                    if user_id is not None
+                    else BulkRegistrationOutcomeEnum.USER_NOT_FOUND
+                ),
+            )
+            for requested_id, email, user_id in requested
+        ]
+
+    @staticmethod
+    def _apply_check_ins(event_id: int, scans: list) -> Dict[str, CheckInResult]:
+        """
+        Check in scanned registrations of the locked event and store the scans.
+        Returns result by scan ID
+        """
+        registration_ids = list({scan.registration_id for scan in scans})
+        with connection.cursor() as cursor:
+            cursor.execute(
+                CHECK_IN_SQL,
+                {"event_id": event_id, "registration_ids": registration_ids},
+            )
+            checked_in = {row[0] for row in cursor.fetchall()}
+        # registrations that were not checked in now are told apart by status
+        statuses = dict(
+            EventRegistration.objects.filter(
+                event_id=event_id,
+                id__in=[rid for rid in registration_ids if rid not in checked_in],
+            ).values_list("id", "status")
+        )
+
+        results = {}
+        for scan in scans:
+            registration_id = scan.registration_id
+            if registration_id in checked_in:
+                # repeated scans of the registration in the batch are duplicates
+                checked_in.remove(registration_id)
+                statuses[registration_id] = EventRegistrationStatus.CHECKED_IN
+                results[scan.scan_id] = CheckInResult.CHECKED_IN
+            elif statuses.get(registration_id) == EventRegistrationStatus.CHECKED_IN:
+                results[scan.scan_id] = CheckInResult.ALREADY_CHECKED_IN
+            else:
+                results[scan.scan_id] = CheckInResult.NOT_REGISTERED
+
+        # a scan stored concurrently by another request keeps its first result
+        CheckInScan.objects.bulk_create(
+            [
+                CheckInScan(
+                    scan_id=scan.scan_id,
+                    event_id=event_id,
+                    registration_id=scan.registration_id,
+                    result=results[scan.scan_id],
+                    scanned_at=scan.scanned_at,
+                )
+                for scan in scans
+            ],
+            ignore_conflicts=True,
+        )
+        return results
+
+    @staticmethod
+    def check_in(
+        user: User, event_id: int, payload: CheckInBatchSchema
+    ) -> List[CheckInScanResultSchema]:
+        """
+        Check in a batch of scans with a constant number of queries.
+        Scans are idempotent by scan ID, known ones return the stored result
+        :exception ConflictingScanError: if a scan ID is repeated in the batch
+        with another registration ID
+        """
+        batch_scans = {}
+        for scan in payload.scans:
+            first = batch_scans.setdefault(scan.scan_id, scan)
+            if first.registration_id != scan.registration_id:
+                raise ConflictingScanError()
+
+        results = {}
+        with transaction.atomic():
+            event = EventsHandler._lock_event(event_id)
+            if event.organizer_id != user.id and not user.is_staff:
+                raise CannotCheckInAttendees()
+            # read under the event lock, a resent batch waits for the first
+            # one to commit and gets its stored results
+            known = {
+                scan["scan_id"]: scan
+                for scan in CheckInScan.objects.filter(
+                    event_id=event_id, scan_id__in=list(batch_scans)
+                ).values("scan_id", "registration_id", "result")
+            }
+            scans = [
+                scan for scan_id, scan in batch_scans.items() if scan_id not in known
+            ]
+            if scans:
+                results = EventsHandler._apply_check_ins(event_id, scans)
+
+        return [
+            CheckInScanResultSchema(
+                scan_id=scan.scan_id,
+                registration_id=known[scan.scan_id]["registration_id"],
+                result=CheckInResultEnum(known[scan.scan_id]["result"]),
+            )
+            if scan.scan_id in known
+            else CheckInScanResultSchema(
+                scan_id=scan.scan_id,
+                registration_id=scan.registration_id,
+                result=CheckInResultEnum(results[scan.scan_id]),
+            )
+            for scan in payload.scans
+        ]
+
+    @staticmethod
+    def get_finished_event_ids(now: datetime, after: Tuple, limit: int) -> List[Tuple]:
+        """
+        Scheduled events that ended before `now`, as (ends_at, id) keys
+        ordered by the partial end time index and starting after `after`
+        """
+        last_ends_at, last_id = after
+        qs = Event.objects.filter(status=EventStatus.SCHEDULED, ends_at__lte=now)
+        if last_ends_at is not None:
+            qs = qs.filter(
+                Q(ends_at__gt=last_ends_at) | Q(ends_at=last_ends_at, id__gt=last_id)
+            )
+        return list(qs.order_by("ends_at", "id").values_list("ends_at", "id")[:limit])
+
+    @staticmethod
+    def finish_event(event_id: int, now: datetime, chunk_size: int) -> int:
+        """
+        Mark unchecked registrations of a finished event as not attended and
+        complete it. Every chunk is a short transaction under the event lock,
+        an interrupted run is continued by the next one.
+        Returns the number of registrations marked as not attended
+        """
+        marked = 0
+        while True:
+            with transaction.atomic():
+                locked_id = (
+                    Event.objects.select_for_update()
+                    .filter(
+                        id=event_id, status=EventStatus.SCHEDULED, ends_at__lte=now
+                    )
+                    .values_list("id", flat=True)
+                    .first()
+                )
+                # deleted, rescheduled or completed in the meantime
+                if locked_id is None:
+                    return marked
+
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        NOT_ATTENDED_SQL, {"event_id": event_id, "limit": chunk_size}
+                    )
+                    count = cursor.fetchone()[0]
+                marked += count
+                if count < chunk_size:
+                    Event.objects.filter(id=event_id).update(
+                        status=EventStatus.COMPLETED, updated_at=timezone.now()
+                    )
+                    EventsHandler.invalidate_event_caches(event_id)
+                    return marked
+
+    @staticmethod
+    def _user_registration_row_to_schema(row: dict) -> UserRegistrationSchema:
+        # rows come from the database, so validation is skipped
+        return UserRegistrationSchema.model_construct(
+            id=row["id"],
+            status=RegistrationStatusEnum(row["status"]),
+            registered_at=row["registered_at"],
+            cancelled_at=row["cancelled_at"],
+            event=EventSummarySchema.model_construct(
+                id=row["event_id"],
+                title=row["event__title"],
+                date=row["event__date"].strftime(EVENT_DATE_FORMAT),
+                location=row["event__location"],
+                status=EventStatusEnum(row["event__status"]),
+                organizer=(
+                    f"{row['event__organizer__first_name']} "
+                    f"{row['event__organizer__last_name']}"
+                ),
+            ),
+        )
+
+    @staticmethod
+    def get_user_registrations(user: User, filters_query) -> UserRegistrationsPageSchema:
+        """
+        Page of the user's registrations, latest first, with event summaries.
+        Events and organizers are joined in, the page is a single query
+        """
+        qs = EventRegistration.objects.filter(user_id=user.id)
+        if filters_query.statuses:
+            qs = qs.filter(
+                status__in=[
+                    s.strip() for s in filters_query.statuses.split(",") if s.strip()
+                ]
+            )
+        if filters_query.period == RegistrationPeriodEnum.UPCOMING:
+            qs = qs.filter(event__ends_at__gt=timezone.now())
+        elif filters_query.period == RegistrationPeriodEnum.PAST:
+            qs = qs.filter(event__ends_at__lte=timezone.now())
+
+        if filters_query.after:
+            position = decode_cursor(filters_query.after)
+            try:
+                last_registered_at = datetime.fromisoformat(position["registered_at"])
+                last_id = int(position["id"])
+            except (KeyError, TypeError, ValueError):
+                raise InvalidCursorError()
+            qs = qs.filter(
+                Q(registered_at__lt=last_registered_at)
+                | Q(registered_at=last_registered_at, id__lt=last_id)
+            )
+
+        limit = filters_query.limit
+        rows = list(
+            qs.order_by("-registered_at", "-id").values(*USER_REGISTRATION_FIELDS)[
+                : limit + 1
+            ]
+        )
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(
+                {
+                    "registered_at": rows[-1]["registered_at"].isoformat(),
+                    "id": rows[-1]["id"],
+                }
+            )
+
+        return UserRegistrationsPageSchema.model_construct(
+            items=[EventsHandler._user_registration_row_to_schema(row) for row in rows],
+            next_cursor=next_cursor,
+        )
@@ -0,0 +1,154 @@
+"""
+Raw statements of registration state changes. Each one changes the
+registration row and the counters of its event in a single round-trip,
+the caller must hold the event row lock.
+Statuses and column names come from the models, values are parameters
+"""
+from apps.events.models import (
+    REGISTRATION_COUNTER_FIELDS,
+    SEAT_HOLDING_STATUSES,
+    Event,
+    EventRegistration,
+    EventRegistrationStatus,
+)
+
+EVENT_TABLE = Event._meta.db_table
+REGISTRATION_TABLE = EventRegistration._meta.db_table
+SEAT_HOLDING_SQL = ", ".join(f"'{status}'" for status in SEAT_HOLDING_STATUSES)
+
+
+def _get_register_sql(status: EventRegistrationStatus) -> str:
+    counter = REGISTRATION_COUNTER_FIELDS[status]
+    assignments = [f"{counter} = {counter} + 1"]
+    if status in SEAT_HOLDING_STATUSES:
+        assignments.append("seats_taken = seats_taken + 1")
+
+    # a cancelled registration is taken over, any other one is left intact
+    return f"""
+        WITH registration AS (
+            INSERT INTO {REGISTRATION_TABLE} AS registration
+                (event_id, user_id, status, registered_at, waitlisted_at)
+            VALUES (%(event_id)s, %(user_id)s, '{status}', %(now)s, %(waitlisted_at)s)
+            ON CONFLICT (event_id, user_id) DO UPDATE SET
+                status = EXCLUDED.status,
+                registered_at = EXCLUDED.registered_at,
+                cancelled_at = NULL,
+                waitlisted_at = EXCLUDED.waitlisted_at
+            WHERE registration.status = '{EventRegistrationStatus.CANCELLED}'
+            RETURNING registration.id, registration.registered_at
+        ), counters AS (
+            UPDATE {EVENT_TABLE} SET {", ".join(assignments)}
+            WHERE id = %(event_id)s AND EXISTS (SELECT 1 FROM registration)
+        )
+        SELECT id, registered_at FROM registration
+    """
+
+
+def _get_cancel_sql() -> str:
+    promoted_deltas = {
+        EventRegistrationStatus.REGISTERED: " + promoted.total",
+        EventRegistrationStatus.PENDING: " - promoted.total",
+    }
+    assignments = [
+        f"{field} = event.{field}"
+        f" - (cancelled.previous_status = '{status}')::int"
+        f"{promoted_deltas.get(status, '')}"
+        for status, field in REGISTRATION_COUNTER_FIELDS.items()
+    ]
+    assignments.append(
+        "seats_taken = event.seats_taken"
+        f" - (cancelled.previous_status IN ({SEAT_HOLDING_SQL}))::int"
+        " + promoted.total"
+    )
+
+    # heads of the waitlist take the seat only when the cancelled one held it,
+    # `free_seats` is counted by the caller as if the seat was released
+    return f"""
+        WITH cancelled AS (
+            UPDATE {REGISTRATION_TABLE} AS registration SET
+                status = '{EventRegistrationStatus.CANCELLED}',
+                cancelled_at = %(now)s,
+                waitlisted_at = NULL
+            FROM (
+                SELECT id, status FROM {REGISTRATION_TABLE}
+                WHERE event_id = %(event_id)s AND user_id = %(user_id)s
+            ) AS previous
+            WHERE registration.id = previous.id
+            RETURNING
+                registration.id,
+                registration.registered_at,
+                previous.status AS previous_status
+        ), promoted AS (
+            UPDATE {REGISTRATION_TABLE} SET
+                status = '{EventRegistrationStatus.REGISTERED}',
+                waitlisted_at = NULL
+            WHERE id IN (
+                SELECT id FROM {REGISTRATION_TABLE}
+                WHERE event_id = %(event_id)s
+                    AND status = '{EventRegistrationStatus.PENDING}'
+                ORDER BY waitlisted_at, id
+                LIMIT CASE
+                    WHEN EXISTS (
+                        SELECT 1 FROM cancelled
+                        WHERE previous_status IN ({SEAT_HOLDING_SQL})
+                    ) THEN %(free_seats)s
+                    ELSE 0
+                END
+            )
+            RETURNING id
+        ), counters AS (
+            UPDATE {EVENT_TABLE} AS event SET {", ".join(assignments)}
+            FROM cancelled, (SELECT count(*) AS total FROM promoted) AS promoted
+            WHERE event.id = %(event_id)s
+        )
+        SELECT id, registered_at, previous_status FROM cancelled
+    """
+
+
+REGISTER_SQL = {
+    status: _get_register_sql(status)
+    for status in (EventRegistrationStatus.REGISTERED, EventRegistrationStatus.PENDING)
+}
+CANCEL_SQL = _get_cancel_sql()
+
+
+CHECK_IN_SQL = f"""
+    WITH checked_in AS (
+        UPDATE {REGISTRATION_TABLE}
+        SET status = '{EventRegistrationStatus.CHECKED_IN}'
+        WHERE event_id = %(event_id)s
+            AND id = ANY(%(registration_ids)s)
+            AND status = '{EventRegistrationStatus.REGISTERED}'
+        RETURNING id
+    ), counters AS (
+        UPDATE {EVENT_TABLE} AS event SET
+            registered_count = event.registered_count - checked_in.total,
+            checked_in_count = event.checked_in_count + checked_in.total
+        FROM (SELECT count(*) AS total FROM checked_in) AS checked_in
+        WHERE event.id = %(event_id)s AND checked_in.total > 0
+    )
+    SELECT id FROM checked_in
+"""
+
+# chunk of registrations left unchecked when the event has finished
+NOT_ATTENDED_SQL = f"""
+    WITH not_attended AS (
+        UPDATE {REGISTRATION_TABLE}
+        SET status = '{EventRegistrationStatus.NOT_ATTENDED}'
+        WHERE id IN (
+            SELECT id FROM {REGISTRATION_TABLE}
+            WHERE event_id = %(event_id)s
+                AND status = '{EventRegistrationStatus.REGISTERED}'
+            LIMIT %(limit)s
+        )
+        RETURNING id
+    ), counters AS (
+        UPDATE {EVENT_TABLE} AS event SET
+            registered_count = event.registered_count - not_attended.total,
+            not_attended_count = event.not_attended_count + not_attended.total,
+            seats_taken = event.seats_taken - not_attended.total
+        FROM (SELECT count(*) AS total FROM not_attended) AS not_attended
+        WHERE event.id = %(event_id)s AND not_attended.total > 0
+    )
+    SELECT count(*) FROM not_attended
+"""
@@ -1,5 +1,8 @@
 from .api_settings import *
 from .base_settings import *
+from .cache_settings import *
 from .internationalization_settings import *
 from .jwt_settings import *
+from .password_hashing_settings import *
+from .rate_limit_settings import *
 from .static_settings import *
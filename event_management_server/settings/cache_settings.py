@@ -0,0 +1,33 @@
+import os
+
+from services.cache.cache import CacheHandler, StrCacheSerializer
+from services.cache.read_through_cache import ReadThroughCache
+from services.cache.redis_cache import RedisCacheEngine
+from services.cache.versioned_cache import VersionedQueryCache
+from services.settings_utils.utils import SettingsConfigsHandler
+
+EVENT_CACHE_TTL = int(os.environ.get("EVENT_CACHE_TTL") or 300)
+EVENTS_LIST_CACHE_TTL = int(os.environ.get("EVENTS_LIST_CACHE_TTL") or 60)
+# seconds between additions of the per-process hit/miss counts to redis
+CACHE_STATS_INTERVAL = float(os.environ.get("CACHE_STATS_INTERVAL") or 10)
+
+
+CACHE_HANDLER = CacheHandler(
+    engine=RedisCacheEngine(config=SettingsConfigsHandler.get_redis_config()),
+    serializer=StrCacheSerializer(),
+)
+
+EVENT_DETAIL_CACHE = ReadThroughCache(
+    cache=CACHE_HANDLER,
+    key_template="event_{id}_detail",
+    name="event_detail",
+    ttl=EVENT_CACHE_TTL,
+    stats_interval=CACHE_STATS_INTERVAL,
+)
+
+EVENTS_LIST_CACHE = VersionedQueryCache(
+    cache=CACHE_HANDLER,
+    namespace="events_list",
+    ttl=EVENTS_LIST_CACHE_TTL,
+    stats_interval=CACHE_STATS_INTERVAL,
+)
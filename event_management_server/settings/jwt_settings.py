@@ -1,6 +1,9 @@
 import os
 
 from services.auth_services.security import JWTHandler, JWTHandlerConfig
+from services.auth_services.revoked_sessions_filter import RevokedSessionsFilter
+from services.auth_services.signing_keys import SigningKeySet
+from services.auth_services.verified_tokens_cache import VerifiedTokensCache
 from services.cache.cache import CacheHandler, StrCacheSerializer
 from services.cache.redis_cache import RedisCacheEngine
 from services.settings_utils.utils import SettingsConfigsHandler
@@ -11,22 +14,68 @@ JWT_SECRET = os.environ.get("JWT_SECRET")
 JWT_ALGORITHM = os.environ.get("JWT_ALGORITHM")
 JWT_TTL_ACCESS = os.environ.get("JWT_TTL_ACCESS")
 JWT_TTL_REFRESH = os.environ.get("JWT_TTL_REFRESH")
+# RS256/EdDSA keys `<kid>.pem`, `<kid>.pub.pem` replacing the secret
+JWT_KEYS_DIR = os.environ.get("JWT_KEYS_DIR")
+JWT_ACTIVE_KEY_ID = os.environ.get("JWT_ACTIVE_KEY_ID")
+JWKS_MAX_AGE = int(os.environ.get("JWKS_MAX_AGE") or 300)
+JWT_MAX_SESSIONS = int(os.environ.get("JWT_MAX_SESSIONS") or 10)
 USER_IDENTIFIER_IN_USER_DATA = "id"
+# tokens are verified without redis, revoked sessions are synced periodically
+JWT_STATELESS = bool(os.environ.get("JWT_STATELESS"))
+# revocations kept per access token lifetime, about one per active user
+REVOKED_SESSIONS_CAPACITY = int(os.environ.get("REVOKED_SESSIONS_CAPACITY") or 1000000)
+REVOKED_SESSIONS_ERROR_RATE = float(
+    os.environ.get("REVOKED_SESSIONS_ERROR_RATE") or 0.001
+)
+REVOKED_SESSIONS_SYNC_INTERVAL = float(
+    os.environ.get("REVOKED_SESSIONS_SYNC_INTERVAL") or 5
+)
+# verified access tokens are trusted without redis for this long
+VERIFIED_TOKENS_CACHE_TTL = float(os.environ.get("VERIFIED_TOKENS_CACHE_TTL") or 5)
+VERIFIED_TOKENS_CACHE_SIZE = int(os.environ.get("VERIFIED_TOKENS_CACHE_SIZE") or 10000)
+
+AUTH_CACHE_HANDLER = CacheHandler(
+    engine=RedisCacheEngine(
+        config=SettingsConfigsHandler.get_redis_config(redis_db_key="REDIS_AUTH_DB")
+    ),
+    serializer=StrCacheSerializer(),
+)
+
+JWT_HANDLER_CONFIG = JWTHandlerConfig(
+    is_use_cache=not JWT_STATELESS,
+    ttl_access_token=JWT_TTL_ACCESS,
+    ttl_refresh_token=JWT_TTL_REFRESH,
+    max_sessions=JWT_MAX_SESSIONS,
+    secret=JWT_SECRET,
+    algorithm=JWT_ALGORITHM,
+    user_identifier_in_user_data=USER_IDENTIFIER_IN_USER_DATA,
+)
 
+JWT_SIGNING_KEYS = None
+if JWT_KEYS_DIR:
+    JWT_SIGNING_KEYS = SigningKeySet.from_directory(
+        JWT_KEYS_DIR, algorithm=JWT_ALGORITHM, active_kid=JWT_ACTIVE_KEY_ID
+    )
 
 JWT_HANDLER = JWTHandler(
-    cache=CacheHandler(
-        engine=RedisCacheEngine(
-            config=SettingsConfigsHandler.get_redis_config(redis_db_key="REDIS_AUTH_DB")
-        ),
-        serializer=StrCacheSerializer(),
+    cache=AUTH_CACHE_HANDLER,
+    verified_tokens=VerifiedTokensCache(
+        max_size=VERIFIED_TOKENS_CACHE_SIZE,
+        ttl=VERIFIED_TOKENS_CACHE_TTL,
+        cache=AUTH_CACHE_HANDLER,
     ),
-    config=JWTHandlerConfig(
-        is_use_cache=True,
-        ttl_access_token=JWT_TTL_ACCESS,
-        ttl_refresh_token=JWT_TTL_REFRESH,
-        secret=JWT_SECRET,
-        algorithm=JWT_ALGORITHM,
-        user_identifier_in_user_data=USER_IDENTIFIER_IN_USER_DATA,
+    # only stateless tokens are checked against the filter
+    revoked_sessions=(
+        RevokedSessionsFilter(
+            cache=AUTH_CACHE_HANDLER,
+            ttl=JWT_HANDLER_CONFIG.ttl_access_token,
+            capacity=REVOKED_SESSIONS_CAPACITY,
+            error_rate=REVOKED_SESSIONS_ERROR_RATE,
+            sync_interval=REVOKED_SESSIONS_SYNC_INTERVAL,
+        )
+        if JWT_STATELESS
+        else None
     ),
+    signing_keys=JWT_SIGNING_KEYS,
+    config=JWT_HANDLER_CONFIG,
 )
@@ -0,0 +1,16 @@
+import os
+
+from services.auth_services.password_hashing_pool import PasswordHashingPool
+
+# hashes run at once, half of the cores, the rest keeps serving other requests
+PASSWORD_HASHING_WORKERS = int(
+    os.environ.get("PASSWORD_HASHING_WORKERS") or max((os.cpu_count() or 2) // 2, 1)
+)
+# hashes waiting for a worker, more are answered with 503
+PASSWORD_HASHING_QUEUE_SIZE = int(
+    os.environ.get("PASSWORD_HASHING_QUEUE_SIZE") or PASSWORD_HASHING_WORKERS * 8
+)
+
+PASSWORD_HASHING_POOL = PasswordHashingPool(
+    max_workers=PASSWORD_HASHING_WORKERS, max_queue=PASSWORD_HASHING_QUEUE_SIZE
+)
@@ -0,0 +1,24 @@
+import os
+
+from services.cache.rate_limiter import RateLimit, RateLimiter
+
+from .jwt_settings import AUTH_CACHE_HANDLER
+
+# `<limit>/<period seconds>` per client IP and per email, `0/0` disables
+LOGIN_RATE_LIMIT_PER_IP = RateLimit.parse(
+    os.environ.get("LOGIN_RATE_LIMIT_PER_IP") or "30/60"
+)
+LOGIN_RATE_LIMIT_PER_EMAIL = RateLimit.parse(
+    os.environ.get("LOGIN_RATE_LIMIT_PER_EMAIL") or "10/300"
+)
+REGISTER_RATE_LIMIT_PER_IP = RateLimit.parse(
+    os.environ.get("REGISTER_RATE_LIMIT_PER_IP") or "10/3600"
+)
+REGISTER_RATE_LIMIT_PER_EMAIL = RateLimit.parse(
+    os.environ.get("REGISTER_RATE_LIMIT_PER_EMAIL") or "3/3600"
+)
+# number of proxies in front of the server appending to X-Forwarded-For,
+# 0 takes the client IP from the connection
+RATE_LIMIT_PROXY_COUNT = int(os.environ.get("RATE_LIMIT_PROXY_COUNT") or 0)
+
+RATE_LIMITER = RateLimiter(cache=AUTH_CACHE_HANDLER)